@@ -1,17 +1,35 @@
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, flash, Response, stream_with_context, g
 from flask_cors import CORS
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 import os
 import json
-from summarizer import NoteSummarizer
-from pdf_handler import PDFHandler, TextProcessor
+import importlib
+from summarizer import NoteSummarizer, StageTimings, stage_histograms
+from pdf_handler import (
+    PDFHandler, TextProcessor, EXTRACTOR_VERSION, parse_page_ranges, truncate_words,
+    report_fingerprint, render_pdf_report_bytes
+)
 from url_processor import WebsiteProcessor, estimate_reading_time, get_domain_name
 from models import db, User, SummaryHistory
+from job_queue import JobQueue
+from cache import DiskCache, MemoryCache, DocumentStore
+from scheduler import InferenceScheduler, AdmissionRejected, configure_inference_threads
+import metrics
+import tracing
+from profiling import cpu_profiler, memory_profiler, ProfilerBusy, MAX_PROFILE_SECONDS
 import logging
 import tempfile
+import queue
+import io
 from werkzeug.utils import secure_filename
 import uuid
-from datetime import datetime
+import time
+import hashlib
+import threading
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,13 +40,42 @@ CORS(app)
 
 # Configuration
 app.config['SECRET_KEY'] = 'your-secret-key-change-this-in-production'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///smartnotes.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///smartnotes.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = tempfile.gettempdir()
+app.config['UPLOAD_MEMORY_LIMIT'] = int(os.environ.get('UPLOAD_MEMORY_LIMIT', 4 * 1024 * 1024))  # larger uploads spool to UPLOAD_FOLDER
+app.config['MAX_BATCH_DOCUMENTS'] = 50
+app.config['ASYNC_SUMMARY_WORD_THRESHOLD'] = 5000  # Larger texts are summarized as background jobs
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 2))
+app.config['INFERENCE_SLOTS'] = int(os.environ.get('INFERENCE_SLOTS', 0)) or None  # None = derive from physical cores
+app.config['INFERENCE_THREADS_PER_SLOT'] = int(os.environ.get('INFERENCE_THREADS_PER_SLOT', 0)) or None
+app.config['INFERENCE_QUEUE_DEPTH'] = int(os.environ.get('INFERENCE_QUEUE_DEPTH', 0)) or None
+app.config['ADMISSION_MAX_WAIT'] = float(os.environ.get('ADMISSION_MAX_WAIT', 30))  # seconds
+app.config['PDF_EXTRACTION_WORKERS'] = int(os.environ.get('PDF_EXTRACTION_WORKERS', 0)) or None  # None = os.cpu_count()
+app.config['EXTRACTION_CACHE_DIR'] = os.environ.get('EXTRACTION_CACHE_DIR', os.path.join('cache', 'extraction'))
+app.config['EXTRACTION_CACHE_MAX_BYTES'] = int(os.environ.get('EXTRACTION_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+app.config['REPORT_CACHE_MAX_BYTES'] = int(os.environ.get('REPORT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+app.config['EXPORT_WORKERS'] = int(os.environ.get('EXPORT_WORKERS', 0)) or (os.cpu_count() or 1)
+app.config['EXPORT_MAX_ITEMS'] = int(os.environ.get('EXPORT_MAX_ITEMS', 5000))
+app.config['DOCUMENT_TTL'] = int(os.environ.get('DOCUMENT_TTL', 3600))  # seconds an uploaded document stays addressable
+app.config['DOCUMENT_STORE_MAX_CHARS'] = int(os.environ.get('DOCUMENT_STORE_MAX_CHARS', 256 * 1024 * 1024))
+app.config['UPLOAD_PREVIEW_CHARS'] = 5000  # matches the original-text excerpt in PDF reports
+app.config['URL_CONNECT_TIMEOUT'] = float(os.environ.get('URL_CONNECT_TIMEOUT', 5))
+app.config['URL_READ_TIMEOUT'] = float(os.environ.get('URL_READ_TIMEOUT', 20))
+app.config['URL_MAX_RETRIES'] = int(os.environ.get('URL_MAX_RETRIES', 3))
+app.config['URL_POOL_MAXSIZE'] = int(os.environ.get('URL_POOL_MAXSIZE', 10))  # connections per host
+app.config['URL_MAX_BYTES'] = int(os.environ.get('URL_MAX_BYTES', 5 * 1024 * 1024))  # decompressed page size
+app.config['URL_MAX_FETCH_SECONDS'] = float(os.environ.get('URL_MAX_FETCH_SECONDS', 30))
+app.config['URL_EXTRACTOR'] = os.environ.get('URL_EXTRACTOR', 'lxml')  # lxml | beautifulsoup
+app.config['HTTP_CACHE_DIR'] = os.environ.get('HTTP_CACHE_DIR', os.path.join('cache', 'http'))
+app.config['HTTP_CACHE_MAX_BYTES'] = int(os.environ.get('HTTP_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+app.config['TRACE_FILE'] = os.environ.get('TRACE_FILE', os.path.join('logs', 'traces.jsonl'))
+app.config['TRACE_SAMPLE_RATE'] = float(os.environ.get('TRACE_SAMPLE_RATE', 0.01))
 
 # Initialize extensions
 db.init_app(app)
+tracing.tracer.configure(app.config['TRACE_FILE'], sample_rate=app.config['TRACE_SAMPLE_RATE'])
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
@@ -40,29 +87,134 @@ ALLOWED_EXTENSIONS = {'txt', 'pdf', 'docx', 'doc', 'pptx', 'ppt'}
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def create_summarizer():
+    """Build the summarizer, or a replacement named by SUMMARIZER_FACTORY=module:callable"""
+    factory = os.environ.get('SUMMARIZER_FACTORY')
+    if factory:
+        module_name, _, attribute = factory.partition(':')
+        logger.info(f"Using summarizer factory {factory}")
+        return getattr(importlib.import_module(module_name), attribute)()
+    return NoteSummarizer()
+
 # User loader for Flask-Login
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
 
-# Initialize components
-try:
-    summarizer = NoteSummarizer()
-    pdf_handler = PDFHandler()
-    text_processor = TextProcessor()
-    website_processor = WebsiteProcessor()
-    logger.info("All components initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize components: {e}")
-    summarizer = None
-    pdf_handler = None
-    text_processor = None
-    website_processor = None
-
-# Create database tables
-with app.app_context():
-    db.create_all()
-    logger.info("Database tables created successfully")
+# Components are built by init_components() at the end of this module
+summarizer = None
+pdf_handler = None
+text_processor = None
+website_processor = None
+extraction_cache = None
+document_store = None
+report_cache = None
+inference_scheduler = None
+job_queue = None
+
+def busy_response(error):
+    """Build the 429 response for a request rejected by admission control"""
+    response = jsonify({
+        'error': f'Server is busy, please retry in {error.retry_after} seconds',
+        'retry_after': error.retry_after,
+        'success': False
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+# ==================== METRICS ====================
+
+metrics.Gauge(
+    'smartnotes_inference_queue_depth',
+    'Summarization requests waiting for an inference slot',
+    callback=lambda: inference_scheduler.stats()['waiting']
+)
+metrics.Gauge(
+    'smartnotes_inference_running',
+    'Summarization requests currently running',
+    callback=lambda: inference_scheduler.stats()['running']
+)
+metrics.Gauge(
+    'smartnotes_inference_avg_wait_seconds',
+    'Average time spent waiting for an inference slot',
+    callback=lambda: inference_scheduler.stats()['avg_wait_seconds']
+)
+metrics.Collector(
+    'smartnotes_inference_tokens_total',
+    'Estimated input tokens processed by the inference pool (use rate() for tokens/s)',
+    'counter',
+    lambda: [('', [], inference_scheduler.tokens_completed)]
+)
+metrics.Collector(
+    'smartnotes_inference_rejected_total',
+    'Summarization requests rejected by admission control',
+    'counter',
+    lambda: [
+        ('', [('reason', 'overload')], inference_scheduler.rejected_overload),
+        ('', [('reason', 'queue_full')], inference_scheduler.rejected_queue_full)
+    ]
+)
+metrics.Gauge(
+    'smartnotes_model_load_seconds',
+    'Time taken to load each summarization model at startup',
+    ['model'],
+    callback=lambda: dict(getattr(summarizer, 'model_load_seconds', {}))
+)
+
+def _collect_stage_histograms():
+    for stage, entry in stage_histograms.snapshot().items():
+        yield from metrics.histogram_samples(
+            stage_histograms.BUCKETS, entry['counts'], entry['sum'], entry['count'], [('stage', stage)]
+        )
+
+metrics.Collector(
+    'smartnotes_summarizer_stage_seconds',
+    'Wall time per summarization stage',
+    'histogram',
+    _collect_stage_histograms
+)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    g.trace_span, g.trace_token = tracing.tracer.start_trace(
+        f"{request.method} {route}",
+        request_id=g.request_id,
+        **{'http.method': request.method, 'http.route': route}
+    )
+
+@app.after_request
+def record_request_metrics(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.HTTP_REQUESTS.labels(route, request.method, response.status_code).inc()
+        metrics.HTTP_LATENCY.labels(route, request.method).observe(time.perf_counter() - start)
+    
+    span = g.get('trace_span')
+    if span is not None:
+        span.set_attribute('http.status_code', response.status_code)
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
+@app.teardown_request
+def end_request_trace(error=None):
+    span = g.pop('trace_span', None)
+    token = g.pop('trace_token', None)
+    try:
+        tracing.tracer.end_trace(span, token, error)
+    except ValueError:
+        # Token created in a different context; the span was still recorded
+        pass
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return Response(metrics.REGISTRY.render(), mimetype=metrics.CONTENT_TYPE)
 
 # ==================== AUTHENTICATION ROUTES ====================
 
@@ -240,10 +392,12 @@ def process_url():
         
         logger.info(f"Processing URL: {url}")
         
-        result = website_processor.extract_content(url)
+        with metrics.EXTRACTION_DURATION.labels('url').time():
+            result = website_processor.extract_content(url)
         
         if not result.get('success'):
-            return jsonify(result), 400
+            status = result.pop('status', 400)
+            return jsonify(result), status
         
         result['reading_time'] = estimate_reading_time(result['word_count'])
         result['domain'] = get_domain_name(url)
@@ -262,6 +416,172 @@ def process_url():
 
 # ==================== FILE UPLOAD ROUTE ====================
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+def receive_upload(file):
+    """Read an upload into memory, hashing it on the way
+    
+    Uploads larger than UPLOAD_MEMORY_LIMIT spill to a named temp file that is deleted
+    when closed. Returns (buffer, sha256 hex, size); the caller must close the buffer.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    buffer = io.BytesIO()
+    try:
+        while True:
+            chunk = file.stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+            if isinstance(buffer, io.BytesIO) and size > app.config['UPLOAD_MEMORY_LIMIT']:
+                spooled = tempfile.NamedTemporaryFile(dir=app.config['UPLOAD_FOLDER'], prefix='upload_')
+                spooled.write(buffer.getvalue())
+                buffer.close()
+                buffer = spooled
+            buffer.write(chunk)
+        buffer.flush()
+        buffer.seek(0)
+    except Exception:
+        buffer.close()
+        raise
+    return buffer, digest.hexdigest(), size
+
+def extraction_source(buffer):
+    """What extractors are given: the spooled file's path, or the in-memory stream"""
+    if isinstance(buffer, io.BytesIO):
+        return buffer
+    return buffer.name
+
+def extraction_cache_key(content_hash, file_extension):
+    return hashlib.sha256(f"{content_hash}:{file_extension}:{EXTRACTOR_VERSION}".encode()).hexdigest()
+
+LANGUAGE_SAMPLE_CHARS = 5000
+
+def stream_pdf_pages(buffer, filename, file_size, page_ranges, max_words):
+    """NDJSON lines, one per extracted page as it finishes, then a summary line
+    
+    Extraction stops at the page where max_words is reached; the buffer is closed
+    by the response's close callback.
+    """
+    words = 0
+    pages_sent = 0
+    sample = []
+    sample_chars = 0
+    truncated = False
+    
+    pages = pdf_handler.iter_pages(extraction_source(buffer), page_ranges)
+    try:
+        for number, text, engine in pages:
+            page_words = len(text.split())
+            words += page_words
+            pages_sent += 1
+            if sample_chars < LANGUAGE_SAMPLE_CHARS:
+                sample.append(text)
+                sample_chars += len(text)
+            
+            yield json.dumps({
+                'page': number,
+                'text': text,
+                'engine': engine,
+                'word_count': page_words
+            }) + '\n'
+            
+            if max_words and words >= max_words:
+                truncated = True
+                break
+    except Exception as e:
+        logger.error(f"Error streaming PDF pages: {e}")
+        yield json.dumps({
+            'error': f'File processing error: {str(e)}',
+            'success': False
+        }) + '\n'
+        return
+    finally:
+        pages.close()
+    
+    detected_lang = 'en'
+    language_name = 'English'
+    if summarizer and sample:
+        try:
+            detected_lang = summarizer.detect_language('\n'.join(sample))
+            language_name = summarizer.get_supported_languages().get(detected_lang, 'Unknown')
+        except:
+            pass
+    
+    yield json.dumps({
+        'done': True,
+        'filename': filename,
+        'pages': pages_sent,
+        'word_count': words,
+        'file_type': 'pdf',
+        'file_size': file_size,
+        'detected_language': detected_lang,
+        'language_name': language_name,
+        'truncated': truncated,
+        'success': True
+    }) + '\n'
+
+def upload_document_response(text, **details):
+    """Store extracted text under a document handle and return a preview of it
+    
+    The full text is included only when the client asks for it (include_text=1).
+    """
+    preview_chars = app.config['UPLOAD_PREVIEW_CHARS']
+    document_id = document_store.put(current_user.id, text, {
+        'filename': details.get('filename'),
+        'file_type': details.get('file_type'),
+        'word_count': details.get('word_count'),
+        'preview_chars': min(len(text), preview_chars)
+    })
+    
+    payload = dict(
+        details,
+        document_id=document_id,
+        expires_in=app.config['DOCUMENT_TTL'],
+        preview=text[:preview_chars],
+        preview_truncated=len(text) > preview_chars,
+        success=True
+    )
+    if request.form.get('include_text', '').lower() in ('1', 'true', 'yes'):
+        payload['text'] = text
+    return jsonify(payload)
+
+def resolve_request_text(data):
+    """Text of a request given as raw 'text' or an uploaded 'document_id'
+    
+    With a document_id, 'edited_preview' replaces the preview part of the stored
+    text, so edits made in the browser apply without truncating the document.
+    Returns (text, None) or (None, error response).
+    """
+    if data and data.get('document_id'):
+        document = document_store.get(data['document_id'], current_user.id)
+        if document is None:
+            return None, (jsonify({
+                'error': 'Uploaded document has expired, please upload it again',
+                'success': False
+            }), 410)
+        text = document['text']
+        edited_preview = data.get('edited_preview')
+        if isinstance(edited_preview, str):
+            text = edited_preview + text[document['metadata'].get('preview_chars', len(text)):]
+        return text.strip(), None
+    
+    if not data or 'text' not in data:
+        return None, (jsonify({
+            'error': 'No text provided',
+            'success': False
+        }), 400)
+    
+    return data['text'].strip(), None
+
+@app.route('/documents/<document_id>', methods=['DELETE'])
+@login_required
+def discard_document(document_id):
+    """Drop an uploaded document's text before its handle expires"""
+    document_store.discard(document_id, current_user.id)
+    return jsonify({'success': True})
+
 @app.route('/upload', methods=['POST'])
 @login_required
 def upload_file():
@@ -283,64 +603,130 @@ def upload_file():
         
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
-            unique_filename = f"{uuid.uuid4()}_{filename}"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-            
-            file.save(filepath)
+            file_extension = filename.rsplit('.', 1)[1].lower()
             
-            try:
-                file_extension = filename.rsplit('.', 1)[1].lower()
-                
-                if file_extension == 'pdf':
-                    text_content = pdf_handler.extract_text_from_pdf(filepath)
-                elif file_extension in ['txt']:
-                    text_content = text_processor.read_text_file(filepath)
-                elif file_extension in ['docx', 'doc']:
-                    text_content = text_processor.extract_text_from_docx(filepath)
-                elif file_extension in ['pptx', 'ppt']:
-                    text_content = text_processor.extract_text_from_pptx(filepath)
-                else:
+            # Optional partial extraction: PDF page ranges ("1-5,8,12-") and a word budget
+            page_ranges = None
+            if request.form.get('pages'):
+                if file_extension != 'pdf':
                     return jsonify({
-                        'error': 'Unsupported file type',
+                        'error': 'Page ranges are only supported for PDF files',
                         'success': False
                     }), 400
-                
-                file_size = os.path.getsize(filepath)
-                os.remove(filepath)
-                
-                if not text_content.strip():
+                try:
+                    page_ranges = parse_page_ranges(request.form['pages'])
+                except ValueError as e:
                     return jsonify({
-                        'error': 'No text could be extracted',
+                        'error': str(e),
                         'success': False
                     }), 400
+            
+            max_words = request.form.get('max_words', type=int)
+            if max_words is not None and max_words < 1:
+                return jsonify({
+                    'error': 'max_words must be a positive integer',
+                    'success': False
+                }), 400
+            
+            partial = page_ranges is not None or max_words is not None
+            stream = request.form.get('stream', '').lower() in ('1', 'true', 'yes')
+            
+            with tracing.span('upload.receive', filename=filename):
+                buffer, content_hash, file_size = receive_upload(file)
+            
+            if stream and file_extension == 'pdf':
+                response = Response(
+                    stream_with_context(stream_pdf_pages(buffer, filename, file_size, page_ranges, max_words)),
+                    mimetype='application/x-ndjson'
+                )
+                response.call_on_close(buffer.close)
+                return response
+            
+            with buffer:
+                cache_key = extraction_cache_key(content_hash, file_extension)
+                cached = None if partial else extraction_cache.get(cache_key)
                 
-                detected_lang = 'en'
-                language_name = 'English'
-                if summarizer:
-                    try:
-                        detected_lang = summarizer.detect_language(text_content)
-                        languages = summarizer.get_supported_languages()
-                        language_name = languages.get(detected_lang, 'Unknown')
-                    except:
-                        pass
+                if cached:
+                    logger.info(f"Extraction cache hit for {filename}")
+                    return upload_document_response(
+                        cached['text'],
+                        filename=filename,
+                        word_count=cached['word_count'],
+                        file_type=file_extension,
+                        file_size=file_size,
+                        detected_language=cached['detected_language'],
+                        language_name=cached['language_name'],
+                        cached=True,
+                        truncated=False
+                    )
                 
-                word_count = len(text_content.split())
+                source = extraction_source(buffer)
+                extraction_start = time.perf_counter()
                 
+                with tracing.span('upload.extract', file_type=file_extension, in_memory=not isinstance(source, str)):
+                    if file_extension == 'pdf':
+                        text_content = pdf_handler.extract_text_from_pdf(source, page_ranges, max_words)
+                    elif file_extension in ['txt']:
+                        text_content = text_processor.read_text_file(source)
+                    elif file_extension in ['docx', 'doc']:
+                        text_content = text_processor.extract_text_from_docx(source)
+                    elif file_extension in ['pptx', 'ppt']:
+                        text_content = text_processor.extract_text_from_pptx(source)
+                    else:
+                        return jsonify({
+                            'error': 'Unsupported file type',
+                            'success': False
+                        }), 400
+                
+                metrics.EXTRACTION_DURATION.labels(file_extension).observe(time.perf_counter() - extraction_start)
+            
+            if not text_content.strip():
                 return jsonify({
+                    'error': 'No text could be extracted',
+                    'success': False
+                }), 400
+            
+            detected_lang = 'en'
+            language_name = 'English'
+            language_detected = False
+            if summarizer:
+                try:
+                    with tracing.span('upload.detect_language'):
+                        detected_lang = summarizer.detect_language(text_content)
+                    languages = summarizer.get_supported_languages()
+                    language_name = languages.get(detected_lang, 'Unknown')
+                    language_detected = True
+                except:
+                    pass
+            
+            truncated = False
+            if max_words is not None:
+                total_words = len(text_content.split())
+                text_content = truncate_words(text_content, max_words)
+                truncated = total_words > max_words
+            
+            word_count = len(text_content.split())
+            
+            # Only cache complete results, so a later hit never skips language detection
+            if language_detected and not partial:
+                extraction_cache.set(cache_key, {
                     'text': text_content,
-                    'filename': filename,
                     'word_count': word_count,
-                    'file_type': file_extension,
-                    'file_size': file_size,
                     'detected_language': detected_lang,
-                    'language_name': language_name,
-                    'success': True
+                    'language_name': language_name
                 })
-                
-            except Exception as e:
-                if os.path.exists(filepath):
-                    os.remove(filepath)
-                raise e
+            
+            return upload_document_response(
+                text_content,
+                filename=filename,
+                word_count=word_count,
+                file_type=file_extension,
+                file_size=file_size,
+                detected_language=detected_lang,
+                language_name=language_name,
+                cached=False,
+                truncated=truncated
+            )
         
         return jsonify({
             'error': 'File type not allowed',
@@ -369,13 +755,9 @@ def summarize():
         
         data = request.get_json()
         
-        if not data or 'text' not in data:
-            return jsonify({
-                'error': 'No text provided for summarization',
-                'success': False
-            }), 400
-        
-        text = data['text'].strip()
+        text, error_response = resolve_request_text(data)
+        if error_response:
+            return error_response
         
         if not text:
             return jsonify({
@@ -392,41 +774,49 @@ def summarize():
         content_type = data.get('content_type', 'text')
         content_source = data.get('content_source', None)
         
+        run_async = data.get('async')
+        if run_async is None:
+            run_async = len(text.split()) > app.config['ASYNC_SUMMARY_WORD_THRESHOLD']
+        
+        if run_async:
+            job_id = job_queue.submit('summarize', current_user.id, dict(data, text=text))
+            logger.info(f"Queued summarization job {job_id} for user {current_user.username}")
+            return jsonify({
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': url_for('get_job_status', job_id=job_id),
+                'result_url': url_for('get_job_result', job_id=job_id),
+                'success': True
+            }), 202
+        
         logger.info(f"Summarizing {content_type} content for user {current_user.username}")
         
-        result = summarizer.summarize_text(
+        # Per-stage timing breakdown on request (?debug=1 or "debug": true)
+        debug = bool(data.get('debug')) or request.args.get('debug') == '1'
+        timings = StageTimings() if debug else None
+        
+        result = inference_scheduler.run(
+            current_user.id,
+            inference_scheduler.estimate_cost(text),
+            summarizer.summarize_text,
             text=text,
             max_length=max_length,
             min_length=min_length,
             summary_type=summary_type,
-            target_language=target_language
+            target_language=target_language,
+            timings=timings
         )
         
+        if timings is not None:
+            result['timings'] = timings.to_dict()
+        
         if save_to_history and result.get('summary'):
             try:
-                history_entry = SummaryHistory(
-                    user_id=current_user.id,
-                    title=data.get('title', f"Summary - {datetime.now().strftime('%Y-%m-%d %H:%M')}"),
-                    original_text=text,
-                    summary_text=result['summary'],
-                    key_points=data.get('key_points', []),
-                    original_word_count=result.get('original_length'),
-                    summary_word_count=result.get('summary_length'),
-                    compression_ratio=result.get('compression_ratio'),
-                    filename=data.get('filename'),
-                    file_type=data.get('file_type'),
-                    detected_language=result.get('detected_language'),
-                    language_name=result.get('language_name'),
-                    target_language=result.get('target_language'),
-                    summary_type=summary_type,
-                    content_type=content_type,
-                    content_source=content_source,
-                    url_domain=data.get('url_domain'),
-                    url_author=data.get('url_author')
-                )
+                history_entry = build_history_entry(data, text, result, current_user.id)
                 
-                db.session.add(history_entry)
-                db.session.commit()
+                with tracing.span('db.save_history'):
+                    db.session.add(history_entry)
+                    db.session.commit()
                 result['history_id'] = history_entry.id
                 logger.info(f"Summary saved to history for user {current_user.username}")
             except Exception as e:
@@ -438,6 +828,8 @@ def summarize():
         
         return jsonify(result)
         
+    except AdmissionRejected as e:
+        return busy_response(e)
     except Exception as e:
         logger.error(f"Error in summarization: {e}")
         return jsonify({
@@ -445,10 +837,33 @@ def summarize():
             'success': False
         }), 500
 
-@app.route('/key-points', methods=['POST'])
+def build_history_entry(data, text, result, user_id):
+    """Build a SummaryHistory row for a summarization request and its result"""
+    return SummaryHistory(
+        user_id=user_id,
+        title=data.get('title', f"Summary - {datetime.now().strftime('%Y-%m-%d %H:%M')}"),
+        original_text=text,
+        summary_text=result['summary'],
+        key_points=data.get('key_points', []),
+        original_word_count=result.get('original_length'),
+        summary_word_count=result.get('summary_length'),
+        compression_ratio=result.get('compression_ratio'),
+        filename=data.get('filename'),
+        file_type=data.get('file_type'),
+        detected_language=result.get('detected_language'),
+        language_name=result.get('language_name'),
+        target_language=result.get('target_language'),
+        summary_type=data.get('summary_type', 'balanced'),
+        content_type=data.get('content_type', 'text'),
+        content_source=data.get('content_source'),
+        url_domain=data.get('url_domain'),
+        url_author=data.get('url_author')
+    )
+
+@app.route('/summarize/batch', methods=['POST'])
 @login_required
-def extract_key_points():
-    """Extract key points from text"""
+def summarize_batch():
+    """Summarize many documents in one call, streaming results as NDJSON"""
     try:
         if not summarizer:
             return jsonify({
@@ -458,13 +873,134 @@ def extract_key_points():
         
         data = request.get_json()
         
-        if not data or 'text' not in data:
+        if not data or not isinstance(data.get('documents'), list) or not data['documents']:
+            return jsonify({
+                'error': 'No documents provided for summarization',
+                'success': False
+            }), 400
+        
+        max_documents = app.config['MAX_BATCH_DOCUMENTS']
+        if len(data['documents']) > max_documents:
             return jsonify({
-                'error': 'No text provided',
+                'error': f'Too many documents (maximum {max_documents} per batch)',
                 'success': False
             }), 400
         
-        text = data['text'].strip()
+        save_to_history = data.get('save_to_history', True)
+        documents = []
+        for item in data['documents']:
+            item = item if isinstance(item, dict) else {}
+            item['text'] = str(item.get('text') or '').strip()
+            documents.append(item)
+        
+        # Admit the whole batch as one unit of work before streaming starts; the
+        # inference thread hands finished items back through a queue and ends with
+        # None, or with (None, message) when the summarizer failed
+        results = queue.Queue()
+        cancelled = threading.Event()
+        
+        def run_batch():
+            try:
+                for item in summarizer.summarize_batch(documents):
+                    if cancelled.is_set():
+                        logger.info("Client disconnected; abandoning batch")
+                        break
+                    results.put(item)
+            except Exception as e:
+                logger.error(f"Batch summarization failed: {e}")
+                results.put((None, str(e)))
+            finally:
+                results.put(None)
+        
+        cost = sum(inference_scheduler.estimate_cost(item['text']) for item in documents)
+        inference_scheduler.submit(current_user.id, cost, run_batch)
+        
+        logger.info(f"Batch summarizing {len(documents)} documents for user {current_user.username}")
+        
+        def format_batch_result(index, result, history_entries):
+            item = documents[index]
+            if not item['text']:
+                result = {
+                    'error': 'Empty text provided',
+                    'success': False
+                }
+            else:
+                result['success'] = not result['summary'].startswith('Error generating summary')
+                if save_to_history and item.get('save_to_history', True) and result['success']:
+                    history_entries.append((index, build_history_entry(item, item['text'], result, current_user.id)))
+            
+            result['index'] = index
+            result['timestamp'] = datetime.now().isoformat()
+            return json.dumps(result) + '\n'
+        
+        def generate():
+            history_entries = []
+            failure = None
+            
+            try:
+                for index, result in iter(results.get, None):
+                    if index is None:
+                        failure = result
+                        break
+                    yield format_batch_result(index, result, history_entries)
+            finally:
+                # Runs on normal completion and when the client goes away mid-stream
+                cancelled.set()
+            
+            # Save the whole batch in a single transaction
+            history_ids = {}
+            if history_entries:
+                try:
+                    db.session.add_all([entry for _, entry in history_entries])
+                    db.session.commit()
+                    history_ids = {index: entry.id for index, entry in history_entries}
+                    logger.info(f"Saved {len(history_entries)} batch summaries for user {current_user.username}")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Error saving batch to history: {e}")
+            
+            summary = {
+                'done': True,
+                'count': len(documents),
+                'history_ids': history_ids,
+                'success': failure is None
+            }
+            if failure is not None:
+                summary['error'] = f'Batch summarization failed: {failure}'
+            yield json.dumps(summary) + '\n'
+        
+        response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        # A client that disconnects before the first chunk never starts generate(),
+        # so its finally block cannot stop the worker
+        response.call_on_close(cancelled.set)
+        return response
+        
+    except AdmissionRejected as e:
+        return busy_response(e)
+    except Exception as e:
+        logger.error(f"Error in batch summarization: {e}")
+        return jsonify({
+            'error': f'Batch summarization failed: {str(e)}',
+            'success': False
+        }), 500
+
+@app.route('/key-points', methods=['POST'])
+@login_required
+def extract_key_points():
+    """Extract key points from text"""
+    try:
+        if not summarizer:
+            return jsonify({
+                'error': 'Summarizer not available',
+                'success': False
+            }), 500
+        
+        data = request.get_json()
+        
+        text, error_response = resolve_request_text(data)
+        if error_response:
+            return error_response
+        
         num_points = data.get('num_points', 5)
         target_language = data.get('target_language', None)
         
@@ -478,6 +1014,14 @@ def extract_key_points():
         
         key_points = summarizer.extract_key_points(text, num_points, target_language)
         
+        # Store on the matching saved summary so its reports can be built server-side
+        history_id = data.get('history_id')
+        if history_id:
+            item = SummaryHistory.query.filter_by(id=history_id, user_id=current_user.id).first()
+            if item and item.original_text.strip() == text:
+                item.key_points = key_points
+                db.session.commit()
+        
         return jsonify({
             'key_points': key_points,
             'num_points': len(key_points),
@@ -492,8 +1036,116 @@ def extract_key_points():
             'success': False
         }), 500
 
+# ==================== BACKGROUND JOBS ====================
+
+def run_summarize_job(job, report_progress):
+    """Job handler: summarize a queued /summarize payload and save it to history"""
+    if not summarizer:
+        raise Exception('Summarizer not available')
+    
+    data = job.payload or {}
+    text = data['text']
+    
+    result = inference_scheduler.run(
+        job.user_id,
+        inference_scheduler.estimate_cost(text),
+        summarizer.summarize_text,
+        reject=False,
+        text=text,
+        max_length=data.get('max_length', 150),
+        min_length=data.get('min_length', 50),
+        summary_type=data.get('summary_type', 'balanced'),
+        target_language=data.get('target_language', None),
+        progress_callback=report_progress
+    )
+    
+    if data.get('save_to_history', True) and result.get('summary'):
+        history_entry = build_history_entry(data, text, result, job.user_id)
+        db.session.add(history_entry)
+        db.session.commit()
+        result['history_id'] = history_entry.id
+    
+    result['success'] = True
+    result['timestamp'] = datetime.now().isoformat()
+    return result
+
+@app.route('/jobs/<job_id>')
+@login_required
+def get_job_status(job_id):
+    """Get status and progress of a background job"""
+    try:
+        job = job_queue.get(job_id, user_id=current_user.id)
+        
+        if not job:
+            return jsonify({
+                'error': 'Job not found',
+                'success': False
+            }), 404
+        
+        response = job.to_dict()
+        response['success'] = True
+        if job.status == 'completed':
+            response['result_url'] = url_for('get_job_result', job_id=job.id)
+        return jsonify(response)
+        
+    except Exception as e:
+        logger.error(f"Error getting job status: {e}")
+        return jsonify({
+            'error': 'Failed to retrieve job status',
+            'success': False
+        }), 500
+
+@app.route('/jobs/<job_id>/result')
+@login_required
+def get_job_result(job_id):
+    """Get the result of a completed background job"""
+    try:
+        job = job_queue.get(job_id, user_id=current_user.id)
+        
+        if not job:
+            return jsonify({
+                'error': 'Job not found',
+                'success': False
+            }), 404
+        
+        if job.status == 'failed':
+            return jsonify({
+                'error': f'Job failed: {job.error}',
+                'status': job.status,
+                'success': False
+            }), 500
+        
+        if job.status != 'completed':
+            return jsonify({
+                'error': 'Job has not finished yet',
+                'status': job.status,
+                'progress': job.progress,
+                'success': False
+            }), 409
+        
+        return jsonify(job.result)
+        
+    except Exception as e:
+        logger.error(f"Error getting job result: {e}")
+        return jsonify({
+            'error': 'Failed to retrieve job result',
+            'success': False
+        }), 500
+
 # ==================== DOWNLOAD ROUTES ====================
 
+def render_report(kind, fingerprint, **fields):
+    """Report bytes for kind 'pdf' or 'text', rendered once per distinct fingerprint"""
+    report = report_cache.get(fingerprint)
+    if report is None:
+        with tracing.span('report.render', kind=kind):
+            if kind == 'pdf':
+                report = pdf_handler.generate_summary_report(**fields)
+            else:
+                report = text_processor.generate_text_report(**fields).encode('utf-8')
+        report_cache.set(fingerprint, report)
+    return report
+
 @app.route('/download-pdf', methods=['POST'])
 @login_required
 def download_pdf():
@@ -514,20 +1166,25 @@ def download_pdf():
                 'success': False
             }), 400
         
-        pdf_path = pdf_handler.generate_summary_report(
-            original_text=data['original_text'],
-            summary=data['summary'],
-            key_points=data['key_points'],
-            metadata=data.get('metadata', {}),
-            filename=data.get('filename', 'summary_report.pdf')
-        )
+        fields = {
+            'original_text': data['original_text'],
+            'summary': data['summary'],
+            'key_points': data['key_points'],
+            'metadata': data.get('metadata', {})
+        }
+        fingerprint = report_fingerprint('pdf', **fields)
+        report = render_report('pdf', fingerprint, **fields)
         
-        return send_file(
-            pdf_path,
+        response = send_file(
+            io.BytesIO(report),
             as_attachment=True,
             download_name=f"smartnotes_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-            mimetype='application/pdf'
+            mimetype='application/pdf',
+            etag=False
         )
+        # Ad-hoc reports carry the current time, so equal fingerprints only mean equal content
+        response.set_etag(fingerprint, weak=True)
+        return response
         
     except Exception as e:
         logger.error(f"Error generating PDF: {e}")
@@ -550,28 +1207,25 @@ def download_text():
                 'success': False
             }), 400
         
-        report_content = text_processor.generate_text_report(
-            summary=data['summary'],
-            key_points=data['key_points'],
-            metadata=data.get('metadata', {}),
-            original_filename=data.get('original_filename', 'Unknown')
-        )
-        
-        temp_file = tempfile.NamedTemporaryFile(
-            mode='w',
-            suffix='.txt',
-            delete=False,
-            encoding='utf-8'
-        )
-        temp_file.write(report_content)
-        temp_file.close()
+        fields = {
+            'summary': data['summary'],
+            'key_points': data['key_points'],
+            'metadata': data.get('metadata', {}),
+            'original_filename': data.get('original_filename', 'Unknown')
+        }
+        fingerprint = report_fingerprint('text', **fields)
+        report = render_report('text', fingerprint, **fields)
         
-        return send_file(
-            temp_file.name,
+        response = send_file(
+            io.BytesIO(report),
             as_attachment=True,
             download_name=f"smartnotes_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-            mimetype='text/plain'
+            mimetype='text/plain',
+            etag=False
         )
+        # Ad-hoc reports carry the current time, so equal fingerprints only mean equal content
+        response.set_etag(fingerprint, weak=True)
+        return response
         
     except Exception as e:
         logger.error(f"Error generating text report: {e}")
@@ -652,6 +1306,103 @@ def get_history_item(history_id):
             'success': False
         }), 500
 
+REPORT_FORMATS = {
+    'pdf': ('pdf', 'application/pdf'),
+    'txt': ('text', 'text/plain; charset=utf-8')
+}
+
+def history_report_fields(item, kind):
+    """Report inputs rebuilt from a stored SummaryHistory row"""
+    metadata = {
+        'word_count': item.original_word_count,
+        'compression_ratio': item.compression_ratio,
+        'detected_language': item.detected_language,
+        'language_name': item.language_name
+    }
+    if item.filename:
+        metadata['filename'] = item.filename
+    metadata = {key: value for key, value in metadata.items() if value is not None}
+    # Dating the report from the row keeps renders byte-identical, so the
+    # fingerprint can serve as a strong ETag across cache evictions and restarts
+    generated_on = item.updated_at or item.created_at
+    
+    if kind == 'pdf':
+        return {
+            'original_text': item.original_text,
+            'summary': item.summary_text,
+            'key_points': item.key_points or [],
+            'metadata': metadata,
+            'generated_on': generated_on
+        }
+    return {
+        'summary': item.summary_text,
+        'key_points': item.key_points or [],
+        'metadata': metadata,
+        'original_filename': item.filename or item.content_source or item.content_type or 'Unknown',
+        'generated_on': generated_on
+    }
+
+@app.route('/api/history/<int:history_id>/report.<fmt>')
+@login_required
+def download_history_report(history_id, fmt):
+    """Download the PDF or text report of a saved summary (supports ETag and Range requests)"""
+    try:
+        if fmt not in REPORT_FORMATS:
+            return jsonify({
+                'error': 'Unsupported report format',
+                'success': False
+            }), 400
+        
+        kind, mimetype = REPORT_FORMATS[fmt]
+        if kind == 'pdf' and not pdf_handler:
+            return jsonify({
+                'error': 'PDF handler not available',
+                'success': False
+            }), 500
+        
+        item = SummaryHistory.query.filter_by(
+            id=history_id,
+            user_id=current_user.id
+        ).first()
+        
+        if not item:
+            return jsonify({
+                'error': 'History item not found',
+                'success': False
+            }), 404
+        
+        fields = history_report_fields(item, kind)
+        fingerprint = report_fingerprint(kind, **fields)
+        
+        # Revalidation needs only the fingerprint, not a render
+        if fingerprint in request.if_none_match:
+            response = Response(status=304)
+            response.set_etag(fingerprint)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        
+        report = render_report(kind, fingerprint, **fields)
+        
+        # send_file answers If-Range/Range with 206 partial content from the in-memory report
+        response = send_file(
+            io.BytesIO(report),
+            as_attachment=True,
+            download_name=f"smartnotes_summary_{item.id}.{fmt}",
+            mimetype=mimetype,
+            etag=fingerprint,
+            last_modified=item.updated_at,
+            conditional=True
+        )
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+        
+    except Exception as e:
+        logger.error(f"Error generating history report: {e}")
+        return jsonify({
+            'error': f'Report generation error: {str(e)}',
+            'success': False
+        }), 500
+
 @app.route('/api/history/<int:history_id>', methods=['DELETE'])
 @login_required
 def delete_history_item(history_id):
@@ -716,6 +1467,215 @@ def toggle_favorite(history_id):
             'success': False
         }), 500
 
+# ==================== BULK EXPORT ====================
+
+EXPORT_BATCH_SIZE = 50
+
+_export_pool = None
+_export_pool_lock = threading.Lock()
+
+def get_export_pool():
+    """Process pool for PDF report rendering, separate from upload extraction"""
+    global _export_pool
+    with _export_pool_lock:
+        if _export_pool is None:
+            _export_pool = ProcessPoolExecutor(
+                max_workers=app.config['EXPORT_WORKERS'],
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _export_pool
+
+class ZipStreamBuffer:
+    """Write-only, unseekable sink for zipfile; written bytes are drained into the response"""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def parse_export_filters(data):
+    """Validated export options from a JSON body; raises ValueError"""
+    formats = data.get('format', 'pdf')
+    formats = ['pdf', 'txt'] if formats == 'both' else [formats]
+    if any(fmt not in REPORT_FORMATS for fmt in formats):
+        raise ValueError("format must be 'pdf', 'txt' or 'both'")
+    
+    start_date = datetime.fromisoformat(data['start_date']) if data.get('start_date') else None
+    end_date = datetime.fromisoformat(data['end_date']) if data.get('end_date') else None
+    # A bare date as end_date means "through the end of that day"
+    if end_date and len(data['end_date'].strip()) == 10:
+        end_date = end_date.date()
+    
+    tags = data.get('tags') or []
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    tags = [tag.strip() for tag in tags if tag.strip()]
+    
+    return formats, start_date, end_date, tags, bool(data.get('favorites_only'))
+
+def export_history_ids(query, start_date, end_date, tags, favorites_only):
+    """Ids of the matching SummaryHistory rows, oldest first"""
+    if start_date:
+        query = query.filter(SummaryHistory.created_at >= start_date)
+    if isinstance(end_date, datetime):
+        query = query.filter(SummaryHistory.created_at <= end_date)
+    elif end_date:
+        query = query.filter(SummaryHistory.created_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+    if tags:
+        # Match whole tags: ",ai," must not match a row tagged "email"
+        padded_tags = db.literal(',') + db.func.replace(SummaryHistory.tags, ', ', ',', type_=db.String) + ','
+        query = query.filter(db.or_(*[padded_tags.contains(f',{tag},', autoescape=True) for tag in tags]))
+    if favorites_only:
+        query = query.filter(SummaryHistory.is_favorite.is_(True))
+    
+    rows = query.with_entities(SummaryHistory.id).order_by(SummaryHistory.created_at, SummaryHistory.id).all()
+    return [row.id for row in rows]
+
+def export_entry_name(item, fmt):
+    title = secure_filename(item.title or '') or 'summary'
+    return f"{item.id:06d}_{title[:80]}.{fmt}"
+
+def generate_history_export(history_ids, formats):
+    """Stream a ZIP of reports for history_ids, rendering PDFs on the export pool
+    
+    Rows are loaded EXPORT_BATCH_SIZE at a time and at most two renders per worker
+    are in flight, so memory stays bounded however many items are exported.
+    Entries are written in completion order as soon as each report is ready.
+    """
+    sink = ZipStreamBuffer()
+    pool = get_export_pool()
+    max_in_flight = app.config['EXPORT_WORKERS'] * 2
+    pending = {}
+    exported = 0
+    failed = []
+    
+    def write_entry(archive, name, created_at, data, compress_type):
+        info = zipfile.ZipInfo(name, date_time=(created_at or datetime.now()).timetuple()[:6])
+        info.compress_type = compress_type
+        archive.writestr(info, data)
+    
+    def collect(archive, futures):
+        nonlocal exported
+        for future in futures:
+            name, created_at = pending.pop(future)
+            try:
+                write_entry(archive, name, created_at, future.result(), zipfile.ZIP_STORED)
+                exported += 1
+            except Exception as e:
+                logger.error(f"Export render failed for {name}: {e}")
+                failed.append({'name': name, 'error': str(e)})
+    
+    try:
+        with zipfile.ZipFile(sink, 'w') as archive:
+            for offset in range(0, len(history_ids), EXPORT_BATCH_SIZE):
+                batch = history_ids[offset:offset + EXPORT_BATCH_SIZE]
+                items = SummaryHistory.query.filter(SummaryHistory.id.in_(batch)).order_by(SummaryHistory.id).all()
+                
+                for item in items:
+                    for fmt in formats:
+                        kind = REPORT_FORMATS[fmt][0]
+                        fields = history_report_fields(item, kind)
+                        name = export_entry_name(item, fmt)
+                        
+                        if kind == 'text':
+                            # Text reports are cheaper to render than to ship to a worker
+                            report = text_processor.generate_text_report(**fields).encode('utf-8')
+                            write_entry(archive, name, item.created_at, report, zipfile.ZIP_DEFLATED)
+                            exported += 1
+                        else:
+                            pending[pool.submit(render_pdf_report_bytes, fields)] = (name, item.created_at)
+                            while len(pending) >= max_in_flight:
+                                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                                collect(archive, done)
+                        
+                        yield sink.drain()
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(archive, done)
+                yield sink.drain()
+            
+            archive.writestr('manifest.json', json.dumps({
+                'exported': exported,
+                'failed': failed,
+                'items': len(history_ids),
+                'formats': formats,
+                'generated_at': datetime.now().isoformat()
+            }, indent=2))
+        
+        # Closing the archive writes the central directory
+        yield sink.drain()
+        logger.info(f"Exported {exported} reports ({len(failed)} failed) for {len(history_ids)} summaries")
+    finally:
+        for future in pending:
+            future.cancel()
+
+def export_response(history_ids, formats):
+    response = Response(
+        stream_with_context(generate_history_export(history_ids, formats)),
+        mimetype='application/zip'
+    )
+    filename = f"smartnotes_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@app.route('/api/history/export', methods=['POST'])
+@login_required
+def export_history():
+    """Download the user's summaries matching a filter as a ZIP of PDF/TXT reports"""
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        try:
+            formats, start_date, end_date, tags, favorites_only = parse_export_filters(data)
+        except ValueError as e:
+            return jsonify({
+                'error': str(e),
+                'success': False
+            }), 400
+        
+        if 'pdf' in formats and not pdf_handler:
+            return jsonify({
+                'error': 'PDF handler not available',
+                'success': False
+            }), 500
+        
+        history_ids = export_history_ids(
+            SummaryHistory.query.filter_by(user_id=current_user.id),
+            start_date, end_date, tags, favorites_only
+        )
+        
+        if not history_ids:
+            return jsonify({
+                'error': 'No summaries match the export filter',
+                'success': False
+            }), 404
+        
+        if len(history_ids) > app.config['EXPORT_MAX_ITEMS']:
+            return jsonify({
+                'error': f"Too many summaries to export at once (max {app.config['EXPORT_MAX_ITEMS']})",
+                'success': False
+            }), 400
+        
+        return export_response(history_ids, formats)
+        
+    except Exception as e:
+        logger.error(f"Error exporting history: {e}")
+        return jsonify({
+            'error': 'Failed to export history',
+            'success': False
+        }), 500
+
 # ==================== ADMIN ROUTES ====================
 
 def admin_required(f):
@@ -871,6 +1831,54 @@ def admin_get_summaries():
             'success': False
         }), 500
 
+@app.route('/api/admin/export', methods=['POST'])
+@admin_required
+def admin_export_summaries():
+    """Export any users' summaries matching a filter as a ZIP of PDF/TXT reports"""
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        try:
+            formats, start_date, end_date, tags, favorites_only = parse_export_filters(data)
+        except ValueError as e:
+            return jsonify({
+                'error': str(e),
+                'success': False
+            }), 400
+        
+        if 'pdf' in formats and not pdf_handler:
+            return jsonify({
+                'error': 'PDF handler not available',
+                'success': False
+            }), 500
+        
+        query = SummaryHistory.query
+        if data.get('user_id'):
+            query = query.filter_by(user_id=data['user_id'])
+        
+        history_ids = export_history_ids(query, start_date, end_date, tags, favorites_only)
+        
+        if not history_ids:
+            return jsonify({
+                'error': 'No summaries match the export filter',
+                'success': False
+            }), 404
+        
+        if len(history_ids) > app.config['EXPORT_MAX_ITEMS']:
+            return jsonify({
+                'error': f"Too many summaries to export at once (max {app.config['EXPORT_MAX_ITEMS']})",
+                'success': False
+            }), 400
+        
+        return export_response(history_ids, formats)
+        
+    except Exception as e:
+        logger.error(f"Error exporting summaries: {e}")
+        return jsonify({
+            'error': 'Failed to export summaries',
+            'success': False
+        }), 500
+
 @app.route('/api/admin/activity')
 @admin_required
 def admin_get_activity():
@@ -915,6 +1923,96 @@ def admin_get_activity():
             'success': False
         }), 500
 
+# ==================== ADMIN PROFILING ROUTES ====================
+
+@app.route('/api/admin/profile/cpu', methods=['POST'])
+@admin_required
+def admin_cpu_profile():
+    """Sample the live process for a few seconds and return collapsed stacks"""
+    try:
+        seconds = request.args.get('seconds', 10, type=float)
+        interval = request.args.get('interval', 0.005, type=float)
+        
+        if seconds <= 0 or seconds > MAX_PROFILE_SECONDS:
+            return jsonify({
+                'error': f'seconds must be between 0 and {MAX_PROFILE_SECONDS}',
+                'success': False
+            }), 400
+        
+        logger.info(f"CPU profile started by {current_user.username} for {seconds}s")
+        collapsed = cpu_profiler.profile(seconds=seconds, interval=interval)
+        
+        return send_file(
+            io.BytesIO(collapsed.encode('utf-8')),
+            mimetype='text/plain',
+            as_attachment=True,
+            download_name=f"smartnotes_cpu_{os.getpid()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.collapsed"
+        )
+        
+    except ProfilerBusy as e:
+        return jsonify({
+            'error': str(e),
+            'success': False
+        }), 409
+    except Exception as e:
+        logger.error(f"Error running CPU profile: {e}")
+        return jsonify({
+            'error': 'Failed to run CPU profile',
+            'success': False
+        }), 500
+
+@app.route('/api/admin/profile/memory', methods=['GET'])
+@admin_required
+def admin_memory_status():
+    """Report whether tracemalloc is running and how much memory it has traced"""
+    status = memory_profiler.status()
+    status['success'] = True
+    return jsonify(status)
+
+@app.route('/api/admin/profile/memory/start', methods=['POST'])
+@admin_required
+def admin_memory_start():
+    """Start tracemalloc allocation tracing"""
+    frames = request.args.get('frames', 10, type=int)
+    status = memory_profiler.start(frames=max(1, min(frames, 50)))
+    logger.info(f"tracemalloc started by {current_user.username}")
+    status['success'] = True
+    return jsonify(status)
+
+@app.route('/api/admin/profile/memory/stop', methods=['POST'])
+@admin_required
+def admin_memory_stop():
+    """Stop tracemalloc and drop its snapshots"""
+    status = memory_profiler.stop()
+    logger.info(f"tracemalloc stopped by {current_user.username}")
+    status['success'] = True
+    return jsonify(status)
+
+@app.route('/api/admin/profile/memory/snapshot', methods=['GET'])
+@admin_required
+def admin_memory_snapshot():
+    """Top allocation sites, or their growth since the previous snapshot with ?diff=1"""
+    try:
+        result = memory_profiler.snapshot(
+            top=request.args.get('top', 25, type=int),
+            group_by=request.args.get('group_by', 'lineno'),
+            diff=request.args.get('diff') == '1'
+        )
+        result['success'] = True
+        return jsonify(result)
+        
+    except RuntimeError as e:
+        return jsonify({
+            'error': str(e),
+            'success': False
+        }), 409
+    except Exception as e:
+        logger.error(f"Error taking memory snapshot: {e}")
+        return jsonify({
+            'error': 'Failed to take memory snapshot',
+            'success': False
+        }), 500
+
 # ==================== HEALTH CHECK ====================
 
 @app.route('/health')
@@ -926,6 +2024,10 @@ def health_check():
         'pdf_handler_available': pdf_handler is not None,
         'website_processor_available': website_processor is not None,
         'supported_formats': list(ALLOWED_EXTENSIONS),
+        'inference': inference_scheduler.stats(),
+        'extraction_cache': extraction_cache.stats(),
+        'report_cache': report_cache.stats(),
+        'documents': document_store.stats(),
         'features': {
             'file_upload': True,
             'website_urls': website_processor is not None,
@@ -1188,6 +2290,83 @@ def export_user_data_csv(user_id):
             'success': False
         }), 500
 
+# ==================== STARTUP ====================
+
+def init_components():
+    """Load the models, open the caches and start the background workers
+    
+    Kept out of module scope because the spawn-context process pools (PDF
+    extraction, bulk export) re-run the launching script as __mp_main__ in every
+    child; those children must not load models or claim jobs.
+    """
+    global summarizer, pdf_handler, text_processor, website_processor
+    global extraction_cache, document_store, report_cache, inference_scheduler, job_queue
+    
+    try:
+        summarizer = create_summarizer()
+        pdf_handler = PDFHandler(extraction_workers=app.config['PDF_EXTRACTION_WORKERS'])
+        text_processor = TextProcessor()
+        website_processor = WebsiteProcessor(
+            connect_timeout=app.config['URL_CONNECT_TIMEOUT'],
+            read_timeout=app.config['URL_READ_TIMEOUT'],
+            max_retries=app.config['URL_MAX_RETRIES'],
+            pool_maxsize=app.config['URL_POOL_MAXSIZE'],
+            cache_dir=app.config['HTTP_CACHE_DIR'],
+            cache_max_bytes=app.config['HTTP_CACHE_MAX_BYTES'],
+            max_bytes=app.config['URL_MAX_BYTES'],
+            max_fetch_seconds=app.config['URL_MAX_FETCH_SECONDS'],
+            extractor=app.config['URL_EXTRACTOR']
+        )
+        logger.info("All components initialized successfully")
+    except Exception as e:
+        logger.error(f"Failed to initialize components: {e}")
+        summarizer = None
+        pdf_handler = None
+        text_processor = None
+        website_processor = None
+    
+    # Extracted text keyed by upload content hash; popular lecture files are only parsed once
+    extraction_cache = DiskCache(
+        app.config['EXTRACTION_CACHE_DIR'],
+        max_bytes=app.config['EXTRACTION_CACHE_MAX_BYTES'],
+        name='extraction'
+    )
+    
+    # Extracted upload text kept server-side; the browser gets a handle and a preview
+    document_store = DocumentStore(
+        ttl=app.config['DOCUMENT_TTL'],
+        max_chars=app.config['DOCUMENT_STORE_MAX_CHARS']
+    )
+    
+    # Rendered PDF/text reports keyed by a hash of their content and template version
+    report_cache = MemoryCache(max_bytes=app.config['REPORT_CACHE_MAX_BYTES'], name='report')
+    
+    # Summarization runs on a fixed pool of inference threads sized to the physical
+    # cores, ordered across request threads and background jobs by the scheduler
+    inference_slots, _ = configure_inference_threads(
+        slots=app.config['INFERENCE_SLOTS'],
+        threads_per_slot=app.config['INFERENCE_THREADS_PER_SLOT']
+    )
+    inference_scheduler = InferenceScheduler(
+        slots=inference_slots,
+        max_wait=app.config['ADMISSION_MAX_WAIT'],
+        max_queue_depth=app.config['INFERENCE_QUEUE_DEPTH']
+    )
+    
+    # Create database tables
+    with app.app_context():
+        db.create_all()
+        metrics.instrument_sqlalchemy(db.engine)
+        logger.info("Database tables created successfully")
+    
+    job_queue = JobQueue(app, num_workers=app.config['JOB_WORKERS'])
+    job_queue.register('summarize', run_summarize_job)
+    if summarizer:
+        job_queue.start()
+
+if __name__ != '__mp_main__':
+    init_components()
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug_mode = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
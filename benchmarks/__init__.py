@@ -0,0 +1,4 @@
+"""
+Benchmarks for SmartNotes AI
+Run from the project root, e.g. python -m benchmarks.bench_summarizer run
+"""
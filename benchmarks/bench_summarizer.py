@@ -0,0 +1,213 @@
+"""
+Summarization benchmark harness
+
+Usage:
+    python -m benchmarks.bench_summarizer run --output results.json
+    python -m benchmarks.bench_summarizer run --mode real --lengths 200,1000
+    python -m benchmarks.bench_summarizer compare baseline.json results.json --threshold 0.10
+
+The default "stub" mode swaps the models, tokenizer and translator for deterministic
+stand-ins so the numbers reflect pipeline overhead only; "real" loads the actual
+models through NoteSummarizer().
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+
+from benchmarks.corpus import build_corpus, DEFAULT_LENGTHS, DEFAULT_LANGUAGES
+
+BENCHMARKS = ('preprocess_text', 'chunk_text', 'detect_language', 'extract_key_points', 'summarize_text')
+
+
+def _timed(fn, repeat, warmup=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _summarize_samples(samples):
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        'runs': len(samples),
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'mean': statistics.fmean(ordered),
+        'p95': ordered[p95_index],
+        'stdev': statistics.stdev(ordered) if len(ordered) > 1 else 0.0
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def make_summarizer(mode, seconds_per_token=0.0):
+    if mode == 'real':
+        from summarizer import NoteSummarizer
+        return NoteSummarizer()
+
+    from benchmarks.stubs import make_stub_summarizer
+    return make_stub_summarizer(seconds_per_token)
+
+
+def run_benchmarks(summarizer, corpus, benchmarks=BENCHMARKS, repeat=5):
+    """Time each benchmark over each corpus document; returns a list of result rows"""
+    tokenizer = summarizer.english_tokenizer
+    rows = []
+
+    for doc in corpus:
+        text = doc['text']
+        processed = summarizer.preprocess_text(text)
+
+        cases = {
+            'preprocess_text': lambda: summarizer.preprocess_text(text),
+            'chunk_text': lambda: summarizer.chunk_text(processed, tokenizer=tokenizer),
+            'detect_language': lambda: summarizer.detect_language(text),
+            'extract_key_points': lambda: summarizer.extract_key_points(text, num_points=5),
+            'summarize_text': lambda: summarizer.summarize_text(text, max_length=150, min_length=50),
+        }
+
+        for name in benchmarks:
+            samples = _timed(cases[name], repeat)
+            row = {
+                'benchmark': name,
+                'case': doc['id'],
+                'language': doc['language'],
+                'words': doc['words'],
+            }
+            row.update(_summarize_samples(samples))
+            rows.append(row)
+            print(f"{name:<20} {doc['id']:<10} median {row['median'] * 1000:9.2f} ms  p95 {row['p95'] * 1000:9.2f} ms")
+
+    return rows
+
+
+def command_run(args):
+    lengths = [int(v) for v in args.lengths.split(',')] if args.lengths else DEFAULT_LENGTHS
+    languages = args.languages.split(',') if args.languages else DEFAULT_LANGUAGES
+    benchmarks = args.benchmarks.split(',') if args.benchmarks else BENCHMARKS
+
+    unknown = set(benchmarks) - set(BENCHMARKS)
+    if unknown:
+        print(f"Unknown benchmarks: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    summarizer = make_summarizer(args.mode, args.stub_seconds_per_token)
+    corpus = build_corpus(lengths, languages, seed=args.seed)
+    rows = run_benchmarks(summarizer, corpus, benchmarks, repeat=args.repeat)
+
+    report = {
+        'meta': {
+            'mode': args.mode,
+            'model': getattr(summarizer, 'english_model_name', None),
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': datetime.now().isoformat()
+        },
+        'results': rows
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(rows)} results to {args.output}")
+    return 0
+
+
+def compare_reports(baseline, current, threshold=0.10, metric='median'):
+    """Pair up rows by (benchmark, case) and flag slowdowns beyond threshold"""
+    base_rows = {(r['benchmark'], r['case']): r for r in baseline['results']}
+    comparisons = []
+
+    for row in current['results']:
+        key = (row['benchmark'], row['case'])
+        base = base_rows.get(key)
+        if base is None or not base[metric]:
+            continue
+        change = (row[metric] - base[metric]) / base[metric]
+        comparisons.append({
+            'benchmark': row['benchmark'],
+            'case': row['case'],
+            'baseline': base[metric],
+            'current': row[metric],
+            'change': change,
+            'regression': change > threshold
+        })
+
+    return comparisons
+
+
+def command_compare(args):
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+
+    if baseline['meta'].get('mode') != current['meta'].get('mode'):
+        print("Warning: comparing runs made in different modes", file=sys.stderr)
+
+    comparisons = compare_reports(baseline, current, args.threshold, args.metric)
+    regressions = [c for c in comparisons if c['regression']]
+
+    for c in comparisons:
+        flag = 'REGRESSION' if c['regression'] else ('faster' if c['change'] < -args.threshold else '')
+        print(
+            f"{c['benchmark']:<20} {c['case']:<10} "
+            f"{c['baseline'] * 1000:9.2f} ms -> {c['current'] * 1000:9.2f} ms "
+            f"({c['change'] * 100:+6.1f}%) {flag}"
+        )
+
+    print(f"\n{len(regressions)} regression(s) over {args.threshold * 100:.0f}% in {len(comparisons)} comparisons")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SmartNotes AI summarization benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help='Run the benchmarks and write JSON results')
+    run.add_argument('--mode', choices=('stub', 'real'), default='stub')
+    run.add_argument('--output', default='benchmark_results.json')
+    run.add_argument('--repeat', type=int, default=5)
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--lengths', help='Comma-separated word counts (default: %s)' % ','.join(map(str, DEFAULT_LENGTHS)))
+    run.add_argument('--languages', help='Comma-separated language codes (default: %s)' % ','.join(DEFAULT_LANGUAGES))
+    run.add_argument('--benchmarks', help='Comma-separated subset of: %s' % ', '.join(BENCHMARKS))
+    run.add_argument('--stub-seconds-per-token', type=float, default=0.0,
+                     help='Simulated generation cost per input token in stub mode')
+    run.set_defaults(func=command_run)
+
+    compare = subparsers.add_parser('compare', help='Compare two result files and flag regressions')
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.10, help='Relative slowdown treated as a regression')
+    compare.add_argument('--metric', choices=('min', 'median', 'mean', 'p95'), default='median')
+    compare.set_defaults(func=command_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+HTML extraction engine benchmark
+
+Usage:
+    python -m benchmarks.bench_url_extraction run --output extraction.json
+    python -m benchmarks.bench_url_extraction run --corpus saved_pages/ --engines lxml,beautifulsoup
+    python -m benchmarks.bench_url_extraction save https://example.com/story --corpus saved_pages/
+
+Each engine in html_extraction.EXTRACTORS parses every page of the corpus; the
+report gives per-page timings and how closely each engine's title, author and
+text match the reference engine (word-level F1). --corpus points at a directory
+of saved .html pages; without it, generated pages in the common layouts of
+benchmarks.fixtures.PAGE_LAYOUTS are used.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import platform
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urlparse
+
+from benchmarks.bench_summarizer import _timed, _summarize_samples, _git_commit
+from benchmarks.fixtures import PAGE_LAYOUTS, render_layout_page
+from html_extraction import EXTRACTORS
+
+REFERENCE_ENGINE = 'beautifulsoup'
+
+
+def load_corpus(directory=None, pages_per_layout=3, words=1500):
+    """Return [(page_id, html bytes)] from a directory of saved pages or generated layouts"""
+    if directory:
+        pages = []
+        for filename in sorted(os.listdir(directory)):
+            if filename.lower().endswith(('.html', '.htm')):
+                with open(os.path.join(directory, filename), 'rb') as f:
+                    pages.append((filename, f.read()))
+        return pages
+
+    return [
+        (f"{layout}-{number}", render_layout_page(layout, number, words))
+        for layout in PAGE_LAYOUTS
+        for number in range(pages_per_layout)
+    ]
+
+
+def text_f1(reference, candidate):
+    """Word-level F1 between two extracted texts (1.0 means identical bags of words)"""
+    ref = Counter(reference.lower().split())
+    cand = Counter(candidate.lower().split())
+    overlap = sum((ref & cand).values())
+    if not overlap:
+        return 1.0 if not ref and not cand else 0.0
+    precision = overlap / sum(cand.values())
+    recall = overlap / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def _extract(engine, html):
+    try:
+        return engine.extract(html), None
+    except Exception as e:
+        return None, str(e)
+
+
+def run_benchmarks(engines, corpus, repeat=5, reference=REFERENCE_ENGINE):
+    """Time every engine on every page and score parity against the reference engine"""
+    rows = []
+
+    for page_id, html in corpus:
+        outputs = {name: _extract(engine, html) for name, engine in engines.items()}
+        expected = outputs.get(reference, (None, None))[0]
+
+        for name, engine in engines.items():
+            page, error = outputs[name]
+            row = {'engine': name, 'case': page_id, 'bytes': len(html), 'error': error}
+            if page is not None:
+                row.update(_summarize_samples(_timed(lambda: engine.extract(html), repeat)))
+                row['words'] = len(page['text'].split())
+                if expected is not None:
+                    row['text_f1'] = text_f1(expected['text'], page['text'])
+                    row['title_match'] = page['title'] == expected['title']
+                    row['author_match'] = page['authors'] == expected['authors']
+            rows.append(row)
+
+            if error:
+                print(f"{name:<14} {page_id:<24} ERROR {error}")
+            else:
+                print(
+                    f"{name:<14} {page_id:<24} median {row['median'] * 1000:8.2f} ms  "
+                    f"words {row['words']:6}  f1 {row.get('text_f1', 0.0):.3f}"
+                )
+
+    return rows
+
+
+def summarize_engines(rows):
+    """Per-engine totals: summed median time, mean text F1 and match rates"""
+    summary = {}
+    for name in sorted({row['engine'] for row in rows}):
+        ok = [row for row in rows if row['engine'] == name and row['error'] is None]
+        scored = [row for row in ok if 'text_f1' in row]
+        summary[name] = {
+            'pages': len(ok),
+            'errors': sum(1 for row in rows if row['engine'] == name and row['error'] is not None),
+            'total_median_s': sum(row['median'] for row in ok),
+            'mean_text_f1': sum(row['text_f1'] for row in scored) / len(scored) if scored else None,
+            'title_match_rate': sum(row['title_match'] for row in scored) / len(scored) if scored else None,
+            'author_match_rate': sum(row['author_match'] for row in scored) / len(scored) if scored else None,
+        }
+    return summary
+
+
+def command_run(args):
+    names = args.engines.split(',') if args.engines else list(EXTRACTORS)
+    unknown = set(names) - set(EXTRACTORS)
+    if unknown:
+        print(f"Unknown engines: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    engines = {name: EXTRACTORS[name]() for name in names}
+    corpus = load_corpus(args.corpus, args.pages_per_layout, args.words)
+    if not corpus:
+        print(f"No .html pages found in {args.corpus}", file=sys.stderr)
+        return 2
+
+    rows = run_benchmarks(engines, corpus, repeat=args.repeat, reference=args.reference)
+    summary = summarize_engines(rows)
+
+    print()
+    for name, stats in summary.items():
+        f1 = f"{stats['mean_text_f1']:.3f}" if stats['mean_text_f1'] is not None else 'n/a'
+        print(f"{name:<14} {stats['total_median_s'] * 1000:9.1f} ms over {stats['pages']} pages  mean f1 {f1}  errors {stats['errors']}")
+
+    report = {
+        'meta': {
+            'corpus': args.corpus or 'generated',
+            'reference': args.reference,
+            'repeat': args.repeat,
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': datetime.now().isoformat()
+        },
+        'summary': summary,
+        'results': rows
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(rows)} results to {args.output}")
+    return 0
+
+
+def command_save(args):
+    """Download pages into the corpus directory for later offline runs"""
+    from url_processor import WebsiteProcessor
+
+    os.makedirs(args.corpus, exist_ok=True)
+    processor = WebsiteProcessor()
+    try:
+        for url in args.urls:
+            response, body = processor.fetch(url)
+            if response.status_code != 200:
+                print(f"Skipping {url}: HTTP {response.status_code}", file=sys.stderr)
+                continue
+            parsed = urlparse(url)
+            slug = re.sub(r'[^A-Za-z0-9]+', '-', f"{parsed.netloc}{parsed.path}").strip('-')[:100]
+            path = os.path.join(args.corpus, f"{slug or 'page'}.html")
+            with open(path, 'wb') as f:
+                f.write(body)
+            print(f"Saved {url} -> {path} ({len(body)} bytes)")
+            time.sleep(args.delay)
+    finally:
+        processor.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SmartNotes AI HTML extraction benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help='Benchmark the extraction engines and write JSON results')
+    run.add_argument('--corpus', help='Directory of saved .html pages (default: generated layouts)')
+    run.add_argument('--engines', help='Comma-separated subset of: %s' % ', '.join(EXTRACTORS))
+    run.add_argument('--reference', default=REFERENCE_ENGINE, help='Engine whose output defines parity')
+    run.add_argument('--output', default='extraction_results.json')
+    run.add_argument('--repeat', type=int, default=5)
+    run.add_argument('--pages-per-layout', type=int, default=3)
+    run.add_argument('--words', type=int, default=1500, help='Article length of generated pages')
+    run.set_defaults(func=command_run)
+
+    save = subparsers.add_parser('save', help='Download pages into a corpus directory')
+    save.add_argument('urls', nargs='+')
+    save.add_argument('--corpus', required=True)
+    save.add_argument('--delay', type=float, default=1.0, help='Seconds between downloads')
+    save.set_defaults(func=command_save)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
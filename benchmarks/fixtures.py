@@ -0,0 +1,248 @@
+"""
+Generated upload fixtures (PDF, DOCX, PPTX, TXT), HTML pages and a local stub web server
+"""
+
+import os
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from benchmarks.corpus import generate_text
+
+
+def _paragraphs(words, seed):
+    text = generate_text('en', words, seed)
+    return [p.strip() for p in text.split('\n\n') if p.strip()]
+
+
+def make_txt(path, words=1500, seed=0):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n\n'.join(_paragraphs(words, seed)))
+    return path
+
+
+def make_pdf(path, words=3000, seed=0):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+    styles = getSampleStyleSheet()
+    story = []
+    for paragraph in _paragraphs(words, seed):
+        story.append(Paragraph(paragraph, styles['Normal']))
+        story.append(Spacer(1, 8))
+    SimpleDocTemplate(path, pagesize=A4).build(story)
+    return path
+
+
+def make_docx(path, words=2000, seed=0):
+    from docx import Document
+
+    document = Document()
+    document.add_heading('Lecture Notes', level=1)
+    for paragraph in _paragraphs(words, seed):
+        document.add_paragraph(paragraph)
+
+    table = document.add_table(rows=3, cols=3)
+    for r, row in enumerate(table.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = f"Row {r + 1} column {c + 1}"
+    document.save(path)
+    return path
+
+
+def make_pptx(path, slides=20, seed=0):
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    presentation = Presentation()
+    layout = presentation.slide_layouts[1]
+    for number in range(slides):
+        slide = presentation.slides.add_slide(layout)
+        slide.shapes.title.text = f"Topic {number + 1}"
+        slide.placeholders[1].text = generate_text('en', 80, seed + number)
+
+        if number % 5 == 0:
+            shape = slide.shapes.add_table(2, 2, Inches(1), Inches(5), Inches(6), Inches(1))
+            for r, row in enumerate(shape.table.rows):
+                for c, cell in enumerate(row.cells):
+                    cell.text = f"Cell {r}-{c}"
+    presentation.save(path)
+    return path
+
+
+def build_upload_fixtures(directory, seed=0):
+    """Create one fixture per supported upload type; returns {file_type: path}"""
+    os.makedirs(directory, exist_ok=True)
+    return {
+        'txt': make_txt(os.path.join(directory, 'notes.txt'), seed=seed),
+        'pdf': make_pdf(os.path.join(directory, 'lecture.pdf'), seed=seed),
+        'docx': make_docx(os.path.join(directory, 'handout.docx'), seed=seed),
+        'pptx': make_pptx(os.path.join(directory, 'slides.pptx'), seed=seed),
+    }
+
+
+ARTICLE_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>{title}</title><meta name="author" content="Stub Author"></head>
+<body>
+<header><nav><a href="/">Home</a> <a href="/news">News</a></nav></header>
+<main><article>
+<h1>{title}</h1>
+{paragraphs}
+</article></main>
+<aside>Related links and advertising</aside>
+<footer>Copyright stub server</footer>
+</body></html>
+"""
+
+
+def render_article(number, words=800):
+    paragraphs = '\n'.join(f"<p>{p}</p>" for p in _paragraphs(words, number))
+    return ARTICLE_TEMPLATE.format(title=f"Stub article {number}", paragraphs=paragraphs).encode('utf-8')
+
+
+def _links(prefix, count):
+    return '\n'.join(f'<li><a href="/{prefix}/{n}">{prefix.title()} link {n}</a></li>' for n in range(count))
+
+
+def _news_page(title, paragraphs, seed):
+    """Heavy news layout: no <article>, deep divs, mega menu, scripts, related stories, comments"""
+    body = '\n'.join(f'<div class="para-wrap"><p>{p}</p></div>' for p in paragraphs)
+    comments = '\n'.join(
+        f'<div class="comment"><p>{c}</p><a href="/reply/{n}">Reply</a></div>'
+        for n, c in enumerate(_paragraphs(300, seed + 1000))
+    )
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title} | Daily Stub</title>
+<meta name="Author" content="News Desk">
+<script>window.dataLayer = [{{"page": "{title}"}}];</script>
+<style>.story-body p {{ margin: 0 0 1em; }}</style></head>
+<body><div id="page">
+<div class="top-bar"><ul class="menu">{_links('section', 60)}</ul></div>
+<div class="layout"><div class="col-main"><div class="story-body" id="story">
+<h1>{title}</h1><p class="byline">By the news desk</p>
+{body}
+</div>
+<div class="related-stories"><h3>Related</h3><ul>{_links('story', 30)}</ul></div>
+<div id="comments" class="comment-list">{comments}</div></div>
+<div class="col-side sidebar"><div class="widget promo"><p>Subscribe today for unlimited access to every story.</p></div>
+<ul>{_links('popular', 20)}</ul></div></div>
+<div class="site-footer"><ul>{_links('about', 25)}</ul></div>
+<script src="/static/app.js"></script></div></body></html>
+"""
+
+
+def _docs_page(title, paragraphs, seed):
+    """Documentation layout: role="main" container with headings and a table of contents"""
+    sections = []
+    for n, p in enumerate(paragraphs):
+        if n % 3 == 0:
+            sections.append(f'<h2 id="s{n}">Section {n // 3 + 1}</h2>')
+        sections.append(f'<p>{p}</p>')
+    return f"""<!DOCTYPE html>
+<html><head><meta http-equiv="Content-Type" content="text/html; charset=utf-8"><title>{title} - Docs</title></head>
+<body><header><nav><ul>{_links('docs', 40)}</ul></nav></header>
+<div class="wrapper"><div class="toc"><ul>{_links('toc', 15)}</ul></div>
+<div role="main" class="document"><h1>{title}</h1>{''.join(sections)}</div></div>
+<footer><p>Documentation stub</p></footer></body></html>
+"""
+
+
+def _blog_page(title, paragraphs, seed):
+    """Blog layout: content in <div class="entry-content">, sidebar archives"""
+    body = '\n'.join(f'<p>{p}</p>' for p in paragraphs)
+    return f"""<!DOCTYPE html>
+<html><head><title>{title}</title><meta name="author" content="Stub Blogger"></head>
+<body><div class="site"><div class="blog-header"><a href="/">Stub blog</a></div>
+<div class="post-meta"><span>Posted in notes</span></div>
+<div class="entry-content"><h2>{title}</h2>{body}</div>
+<div class="archives"><ul>{_links('archive', 48)}</ul></div></div></body></html>
+"""
+
+
+PAGE_LAYOUTS = {
+    'article': lambda title, paragraphs, seed: ARTICLE_TEMPLATE.format(
+        title=title, paragraphs='\n'.join(f"<p>{p}</p>" for p in paragraphs)
+    ),
+    'news': _news_page,
+    'docs': _docs_page,
+    'blog': _blog_page,
+}
+
+
+def render_layout_page(layout, number, words=1500):
+    """A page in one of PAGE_LAYOUTS, shaped like common real-world templates"""
+    title = f"{layout.title()} page {number}"
+    return PAGE_LAYOUTS[layout](title, _paragraphs(words, number), number).encode('utf-8')
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients can reuse connections
+    protocol_version = 'HTTP/1.1'
+    pages = {}
+    lock = threading.Lock()
+
+    def _next_response(self):
+        """(status, headers, body, delay) for this request, or None for a 404"""
+        page = self.pages.get(self.path)
+        if page is None:
+            return None
+        if isinstance(page, bytes):
+            return 200, {}, page, 0
+        with self.lock:
+            # A scripted list is served in order; the last response then repeats
+            response = page.pop(0) if len(page) > 1 else page[0]
+        status, headers, body, *delay = response
+        return status, headers, body, delay[0] if delay else 0
+
+    def do_GET(self):
+        response = self._next_response()
+        if response is None:
+            self.send_error(404)
+            return
+        status, headers, body, delay = response
+        if delay:
+            time.sleep(delay)
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubWebServer:
+    """Local HTTP server serving a fixed set of article pages at /article/<n>
+
+    pages maps paths to a body, or to a list of (status, headers, body[, delay])
+    responses served in turn, e.g. a 503 followed by the real page.
+    """
+
+    def __init__(self, pages=None, articles=10, host='127.0.0.1', port=0):
+        if pages is None:
+            pages = {f"/article/{n}": render_article(n) for n in range(articles)}
+        handler = type('StubHandler', (_StubHandler,), {'pages': pages})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='stub-web', daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls(self):
+        return [self.base_url + path for path in sorted(self.server.RequestHandlerClass.pages)]
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        return False
@@ -0,0 +1,274 @@
+"""
+HTTP load test for the SmartNotes AI Flask app
+
+Usage:
+    python -m benchmarks.load_test --users 20 --duration 60
+    python -m benchmarks.load_test --users 50 --duration 120 --fake-seconds-per-token 0.0005 --output load.json
+    python -m benchmarks.load_test --target http://staging:5000 --users 10
+
+Without --target the app is started in-process against a throwaway SQLite database,
+a fake summarizer (SUMMARIZER_FACTORY) and a local stub web server for /process-url,
+so the whole run is offline. Each virtual user logs in and replays a weighted mix of
+uploads, URL processing, summarization and history browsing.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import statistics
+from collections import defaultdict
+
+import requests
+
+from benchmarks.corpus import generate_text
+from benchmarks.fixtures import build_upload_fixtures, StubWebServer
+
+DEFAULT_MIX = {
+    'summarize': 40,
+    'upload': 20,
+    'process_url': 15,
+    'history': 25,
+}
+
+
+class Recorder:
+    """Thread-safe collection of per-endpoint latencies and errors"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint, seconds, status, ok):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            self.statuses[endpoint][status] += 1
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def report(self, elapsed):
+        endpoints = {}
+        with self._lock:
+            for endpoint, samples in sorted(self.latencies.items()):
+                ordered = sorted(samples)
+                count = len(ordered)
+                endpoints[endpoint] = {
+                    'requests': count,
+                    'throughput_rps': count / elapsed if elapsed else 0.0,
+                    'error_rate': self.errors[endpoint] / count if count else 0.0,
+                    'p50_ms': _percentile(ordered, 0.50) * 1000,
+                    'p95_ms': _percentile(ordered, 0.95) * 1000,
+                    'p99_ms': _percentile(ordered, 0.99) * 1000,
+                    'mean_ms': statistics.fmean(ordered) * 1000,
+                    'statuses': dict(self.statuses[endpoint])
+                }
+        total = sum(e['requests'] for e in endpoints.values())
+        errors = sum(self.errors.values())
+        return {
+            'duration_s': elapsed,
+            'total_requests': total,
+            'throughput_rps': total / elapsed if elapsed else 0.0,
+            'error_rate': errors / total if total else 0.0,
+            'endpoints': endpoints
+        }
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class VirtualUser:
+    """One logged-in client replaying the request mix"""
+
+    def __init__(self, base_url, username, password, fixtures, urls, recorder, mix, seed):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.fixtures = fixtures
+        self.urls = urls
+        self.recorder = recorder
+        self.rng = random.Random(seed)
+        self.actions = list(mix)
+        self.weights = [mix[a] for a in self.actions]
+        self.session = requests.Session()
+
+    def _request(self, endpoint, method, path, **kwargs):
+        start = time.perf_counter()
+        status = 0
+        ok = False
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=300, **kwargs)
+            status = response.status_code
+            # Consume streamed bodies so latency covers the whole response
+            body = response.content
+            ok = response.ok
+            return response, body
+        except requests.RequestException:
+            return None, None
+        finally:
+            self.recorder.record(endpoint, time.perf_counter() - start, status, ok)
+
+    def login(self):
+        credentials = {'username': self.username, 'email': f"{self.username}@loadtest.local", 'password': self.password}
+        self.session.post(self.base_url + '/register', json=credentials, timeout=30)
+        response = self.session.post(self.base_url + '/login', json=credentials, timeout=30)
+        if not response.ok:
+            raise RuntimeError(f"Login failed for {self.username}: {response.status_code}")
+
+    def run(self, deadline):
+        while time.monotonic() < deadline:
+            action = self.rng.choices(self.actions, self.weights)[0]
+            getattr(self, f"do_{action}")()
+
+    def do_summarize(self):
+        words = self.rng.choice((150, 400, 1200, 3000))
+        text = generate_text('en', words, seed=self.rng.randint(0, 10_000))
+        self._request('/summarize', 'POST', '/summarize', json={
+            'text': text,
+            'summary_type': self.rng.choice(('brief', 'balanced', 'detailed')),
+            'async': False
+        })
+
+    def do_upload(self):
+        file_type = self.rng.choice(sorted(self.fixtures))
+        path = self.fixtures[file_type]
+        with open(path, 'rb') as f:
+            self._request('/upload', 'POST', '/upload', files={'file': (os.path.basename(path), f)})
+
+    def do_process_url(self):
+        if not self.urls:
+            return
+        self._request('/process-url', 'POST', '/process-url', json={'url': self.rng.choice(self.urls)})
+
+    def do_history(self):
+        page = self.rng.randint(1, 3)
+        self._request('/api/history', 'GET', f"/api/history?page={page}&per_page=10")
+
+
+def start_local_app(database_path, summarizer_factory):
+    """Import the app with offline settings and serve it on a random local port"""
+    os.environ['DATABASE_URL'] = f"sqlite:///{database_path}"
+    os.environ['SUMMARIZER_FACTORY'] = summarizer_factory
+    os.environ.setdefault('TRACE_SAMPLE_RATE', '0')
+
+    from werkzeug.serving import make_server
+    from app import app
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name='load-test-app', daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def fake_summarizer():
+    """Default SUMMARIZER_FACTORY target: stub models with simulated generation cost"""
+    from benchmarks.stubs import make_stub_summarizer
+    return make_stub_summarizer(float(os.environ.get('FAKE_SECONDS_PER_TOKEN', '0.0002')))
+
+
+def parse_mix(value):
+    mix = dict(DEFAULT_MIX)
+    if value:
+        for part in value.split(','):
+            name, _, weight = part.partition('=')
+            if name not in DEFAULT_MIX:
+                raise argparse.ArgumentTypeError(f"Unknown action in mix: {name}")
+            mix[name] = float(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def print_report(report):
+    print(f"\n{'endpoint':<14} {'reqs':>6} {'rps':>7} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for endpoint, stats in report['endpoints'].items():
+        print(
+            f"{endpoint:<14} {stats['requests']:>6} {stats['throughput_rps']:>7.2f} "
+            f"{stats['error_rate'] * 100:>6.1f} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}"
+        )
+    print(
+        f"\nTotal: {report['total_requests']} requests in {report['duration_s']:.1f}s "
+        f"({report['throughput_rps']:.2f} req/s, {report['error_rate'] * 100:.1f}% errors)"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SmartNotes AI HTTP load test")
+    parser.add_argument('--target', help='Base URL of a running server (default: start the app in-process)')
+    parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run after ramp-up')
+    parser.add_argument('--ramp-up', type=float, default=5, help='Seconds over which users start')
+    parser.add_argument('--mix', type=parse_mix, default=dict(DEFAULT_MIX),
+                        help='Action weights, e.g. summarize=50,upload=10,process_url=10,history=30')
+    parser.add_argument('--summarizer-factory', default='benchmarks.load_test:fake_summarizer',
+                        help='module:callable returning the summarizer for the in-process app')
+    parser.add_argument('--fake-seconds-per-token', type=float, default=0.0002,
+                        help='Simulated generation cost of the default fake summarizer')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    args = parser.parse_args(argv)
+
+    os.environ['FAKE_SECONDS_PER_TOKEN'] = str(args.fake_seconds_per_token)
+    workdir = tempfile.mkdtemp(prefix='smartnotes_load_')
+    fixtures = build_upload_fixtures(os.path.join(workdir, 'fixtures'), seed=args.seed)
+
+    server = None
+    with StubWebServer() as web:
+        if args.target:
+            base_url = args.target
+        else:
+            server, base_url = start_local_app(os.path.join(workdir, 'load.db'), args.summarizer_factory)
+        print(f"Load testing {base_url} with {args.users} users for {args.duration:.0f}s")
+
+        recorder = Recorder()
+        users = [
+            VirtualUser(base_url, f"load{n:04d}", 'loadtest-password', fixtures, web.urls(),
+                        recorder, args.mix, seed=args.seed * 1000 + n)
+            for n in range(args.users)
+        ]
+        for user in users:
+            user.login()
+
+        start = time.monotonic()
+        deadline = start + args.ramp_up + args.duration
+        threads = []
+        for n, user in enumerate(users):
+            thread = threading.Thread(target=user.run, args=(deadline,), name=f"vu-{n}", daemon=True)
+            thread.start()
+            threads.append(thread)
+            time.sleep(args.ramp_up / max(1, args.users))
+
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+
+        if server is not None:
+            server.shutdown()
+
+    report = recorder.report(elapsed)
+    report['config'] = {
+        'target': args.target or 'in-process',
+        'users': args.users,
+        'duration_s': args.duration,
+        'mix': args.mix,
+        'fake_seconds_per_token': None if args.target else args.fake_seconds_per_token
+    }
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote report to {args.output}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Deterministic stand-ins for the summarization models and translator
+Used to measure pipeline overhead without loading transformers models
+"""
+
+import time
+import zlib
+
+from summarizer import NoteSummarizer
+
+
+class StubTokenizer:
+    """Whitespace tokenizer with the encode() interface used by NoteSummarizer"""
+
+    def encode(self, text, add_special_tokens=True):
+        tokens = [zlib.crc32(word.encode('utf-8')) & 0xFFFF for word in text.split()]
+        if add_special_tokens:
+            return [0] + tokens + [2]
+        return tokens
+
+
+class StubSummarizationPipeline:
+    """Callable mimicking a transformers summarization pipeline
+
+    Returns the first max_length words of each input, optionally sleeping a fixed
+    time per input token to emulate generation cost.
+    """
+
+    def __init__(self, seconds_per_token=0.0):
+        self.seconds_per_token = seconds_per_token
+        self.calls = 0
+
+    def __call__(self, inputs, max_length=150, min_length=50, do_sample=False, truncation=True, batch_size=None):
+        self.calls += 1
+        single = isinstance(inputs, str)
+        texts = [inputs] if single else list(inputs)
+
+        results = []
+        for text in texts:
+            words = text.split()
+            if self.seconds_per_token:
+                time.sleep(len(words) * self.seconds_per_token)
+            results.append({'summary_text': ' '.join(words[:int(max_length)])})
+        return results
+
+
+class _Translation:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubTranslator:
+    """Offline translator returning the input unchanged"""
+
+    def translate(self, text, src='auto', dest='en'):
+        return _Translation(text)
+
+
+def make_stub_summarizer(seconds_per_token=0.0):
+    """NoteSummarizer wired to stub models, tokenizer and translator"""
+    summarizer = NoteSummarizer(load_models=False)
+    summarizer.translator = StubTranslator()
+    summarizer.english_summarizer = StubSummarizationPipeline(seconds_per_token)
+    summarizer.english_tokenizer = StubTokenizer()
+    summarizer.english_model_name = 'stub'
+    summarizer.multilingual_summarizer = summarizer.english_summarizer
+    summarizer.multilingual_tokenizer = summarizer.english_tokenizer
+    return summarizer
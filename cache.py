@@ -0,0 +1,243 @@
+"""
+Caching Module for SmartNotes AI
+Size-bounded caches for expensive, content-addressed results
+"""
+
+import os
+import json
+import time
+import uuid
+import secrets
+import threading
+import logging
+from collections import OrderedDict
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """Bounded on-disk JSON cache with least-recently-used eviction
+
+    Entries are stored one file per key under two-character shard directories and
+    written atomically, so several processes may share a directory. Each process
+    keeps its own size index, seeded from the directory at startup; entries removed
+    by another process are treated as misses.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024, name='disk'):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.name = name
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self._total_bytes = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _load_index(self):
+        found = []
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                if not filename.endswith('.json'):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                found.append((stat.st_mtime, filename[:-5], stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+        self._evict()
+        logger.info(f"{self.name} cache: {len(self._entries)} entries, {self._total_bytes} bytes in {self.directory}")
+
+    def get(self, key):
+        """Return the cached value or None"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                size = self._entries.pop(key, None)
+                if size is not None:
+                    self._total_bytes -= size
+            metrics.CACHE_LOOKUPS.labels(self.name, 'miss').inc()
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        try:
+            # mtime doubles as recency so eviction order survives restarts
+            os.utime(path)
+        except OSError:
+            pass
+
+        metrics.CACHE_LOOKUPS.labels(self.name, 'hit').inc()
+        return value
+
+    def set(self, key, value):
+        """Store a JSON-serializable value, evicting old entries past max_bytes"""
+        data = json.dumps(value, ensure_ascii=False).encode('utf-8')
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"{self.name} cache write failed: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes; caller holds the lock"""
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+class MemoryCache:
+    """Bounded in-process LRU cache for bytes values, sized by total payload bytes"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, name='memory'):
+        self.max_bytes = max_bytes
+        self.name = name
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> bytes, least recently used first
+        self._total_bytes = 0
+
+    def get(self, key):
+        """Return the cached bytes or None"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        metrics.CACHE_LOOKUPS.labels(self.name, 'hit' if value is not None else 'miss').inc()
+        return value
+
+    def set(self, key, value):
+        """Store bytes, evicting least recently used entries past max_bytes"""
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= len(previous)
+            self._entries[key] = value
+            self._total_bytes += len(value)
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+class DocumentStore:
+    """Short-lived, per-user store of extracted document text behind opaque handles
+
+    Entries expire ttl seconds after their last use; the oldest are also evicted
+    once the stored text exceeds max_chars in total.
+    """
+
+    def __init__(self, ttl=3600, max_chars=256 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # handle -> entry dict, least recently used first
+        self._total_chars = 0
+
+    def put(self, user_id, text, metadata=None):
+        """Store text for user_id and return its handle"""
+        handle = secrets.token_urlsafe(16)
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            self._entries[handle] = {
+                'user_id': user_id,
+                'text': text,
+                'metadata': metadata or {},
+                'expires_at': now + self.ttl
+            }
+            self._total_chars += len(text)
+            while self._total_chars > self.max_chars and len(self._entries) > 1:
+                self._drop(next(iter(self._entries)))
+        return handle
+
+    def get(self, handle, user_id):
+        """Return {'text', 'metadata'} for the owner's live handle, else None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None or entry['user_id'] != user_id:
+                return None
+            if entry['expires_at'] <= now:
+                self._drop(handle)
+                return None
+            entry['expires_at'] = now + self.ttl
+            self._entries.move_to_end(handle)
+            return {'text': entry['text'], 'metadata': entry['metadata']}
+
+    def discard(self, handle, user_id):
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is not None and entry['user_id'] == user_id:
+                self._drop(handle)
+
+    def _drop(self, handle):
+        entry = self._entries.pop(handle)
+        self._total_chars -= len(entry['text'])
+
+    def _purge(self, now):
+        """Drop expired entries; caller holds the lock"""
+        expired = [handle for handle, entry in self._entries.items() if entry['expires_at'] <= now]
+        for handle in expired:
+            self._drop(handle)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'documents': len(self._entries),
+                'chars': self._total_chars,
+                'max_chars': self.max_chars,
+                'ttl_seconds': self.ttl
+            }
@@ -0,0 +1,255 @@
+"""
+HTML Extraction Module for SmartNotes AI
+Pluggable engines that pull the title, main text and author out of a web page
+"""
+
+import re
+import codecs
+import threading
+import logging
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+try:
+    from lxml import etree
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Elements whose text never belongs to the article
+BOILERPLATE_TAGS = ('script', 'style', 'nav', 'footer', 'header', 'aside', 'iframe', 'noscript')
+TEXT_BLOCK_TAGS = ('p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+MAIN_CONTENT_SELECTORS = ('article', 'main', '[role="main"]')
+CONTENT_CLASS_PATTERNS = tuple(re.compile(pattern, re.I) for pattern in ('content', 'article', 'post', 'entry', 'body'))
+AUTHOR_NAME = re.compile('author', re.I)
+WHITESPACE = re.compile(r'\s+')
+
+
+def clean_whitespace(text):
+    return WHITESPACE.sub(' ', text).strip()
+
+
+# ==================== BEAUTIFULSOUP ENGINE ====================
+
+class BeautifulSoupExtractor:
+    """Selector cascade over a pure-Python html.parser tree"""
+
+    name = 'beautifulsoup'
+
+    def extract(self, content):
+        """Return {'title', 'text', 'authors'} for an HTML document (bytes or str)"""
+        soup = BeautifulSoup(content, 'html.parser')
+
+        for element in soup(list(BOILERPLATE_TAGS)):
+            element.decompose()
+
+        title = soup.find('title')
+        title_text = title.get_text().strip() if title else 'Webpage'
+
+        main_content = None
+        for selector in MAIN_CONTENT_SELECTORS:
+            main_content = soup.select_one(selector)
+            if main_content:
+                break
+
+        if not main_content:
+            for pattern in CONTENT_CLASS_PATTERNS:
+                main_content = soup.find(['div', 'section'], class_=pattern)
+                if main_content:
+                    break
+
+        if not main_content:
+            main_content = soup.find('body')
+
+        if main_content:
+            paragraphs = main_content.find_all(list(TEXT_BLOCK_TAGS))
+            text_parts = [p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)]
+            text = ' '.join(text_parts)
+        else:
+            text = soup.get_text(separator=' ', strip=True)
+
+        author = 'Unknown'
+        author_meta = soup.find('meta', attrs={'name': AUTHOR_NAME})
+        if author_meta and author_meta.get('content'):
+            author = author_meta['content']
+
+        return {'title': title_text, 'text': clean_whitespace(text), 'authors': author}
+
+
+# ==================== LXML ENGINE ====================
+
+# Candidate blocks are weighted by their class and id, readability style
+POSITIVE_HINTS = re.compile(r'article|body|content|entry|main|page|post|story|text', re.I)
+NEGATIVE_HINTS = re.compile(
+    r'banner|combx|comment|contact|disqus|foot|menu|meta|modal|nav|outbrain|promo|related|'
+    r'remark|share|shoutbox|sidebar|social|sponsor|subscribe|tag|taboola|widget',
+    re.I
+)
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.I)
+# A semantic container shorter than this is probably a teaser; let the scoring decide instead
+MIN_MAIN_CONTENT_CHARS = 250
+ENCODING_SNIFF_BYTES = 2048
+
+if LXML_AVAILABLE:
+    _BOILERPLATE = etree.XPath(' | '.join(f"//{tag}" for tag in BOILERPLATE_TAGS))
+    _TITLE = etree.XPath('(//title)[1]')
+    _MAIN_CONTENT = tuple(
+        etree.XPath(path) for path in ('(//article)[1]', '(//main)[1]', '(//*[@role="main"])[1]')
+    )
+    _AUTHOR_META = etree.XPath(
+        '//meta[contains(translate(@name, "AUTHOR", "author"), "author")][normalize-space(@content)]/@content'
+    )
+    _BODY = etree.XPath('(//body)[1]')
+
+
+def _sniff_encoding(content):
+    """Best guess at a page's encoding: BOM, then <meta charset>, then UTF-8 if it decodes"""
+    for bom, encoding in ((codecs.BOM_UTF8, 'utf-8'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16')):
+        if content.startswith(bom):
+            return encoding
+
+    match = META_CHARSET.search(content[:ENCODING_SNIFF_BYTES])
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode('ascii')).name
+        except LookupError:
+            pass
+
+    try:
+        content.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp1252'
+
+
+def _block_text(element):
+    return clean_whitespace(element.text_content())
+
+
+class LxmlExtractor:
+    """libxml2 parsing with precompiled XPath and one text-density scoring pass
+
+    <article>, <main> and role="main" are trusted when they hold real text, as in
+    the BeautifulSoup engine. Otherwise every paragraph and heading is visited once:
+    its length and commas are credited to its parent (and half to its grandparent),
+    along with its link text. Candidates are then ranked by that score, scaled by
+    class/id hints and discounted by link density, so menus and comment lists lose
+    to the article body.
+    """
+
+    name = 'lxml'
+
+    def __init__(self):
+        if not LXML_AVAILABLE:
+            raise ImportError("lxml is not installed")
+        # Parsers keep state between documents, so each thread gets its own
+        self._local = threading.local()
+
+    def _parser(self, encoding):
+        parsers = getattr(self._local, 'parsers', None)
+        if parsers is None:
+            parsers = self._local.parsers = {}
+        parser = parsers.get(encoding)
+        if parser is None:
+            parser = parsers[encoding] = lxml.html.HTMLParser(
+                encoding=encoding, remove_comments=True, remove_pis=True
+            )
+        return parser
+
+    def _parse(self, content):
+        if isinstance(content, str):
+            return lxml.html.document_fromstring(content, parser=self._parser(None))
+        encoding = _sniff_encoding(content)
+        return lxml.html.document_fromstring(content, parser=self._parser(encoding))
+
+    @staticmethod
+    def _class_weight(element):
+        hints = f"{element.get('class', '')} {element.get('id', '')}"
+        weight = 1.0
+        if POSITIVE_HINTS.search(hints):
+            weight += 0.25
+        if NEGATIVE_HINTS.search(hints):
+            weight -= 0.5
+        return weight
+
+    def _best_candidate(self, root):
+        """Single pass over the text blocks, scoring their containers"""
+        scores = {}
+        lengths = {}
+        link_lengths = {}
+
+        for block in root.iter(*TEXT_BLOCK_TAGS):
+            text = _block_text(block)
+            if len(text) < 25:
+                continue
+            links = sum(len(_block_text(link)) for link in block.iter('a'))
+            points = 1 + text.count(',') + min(len(text) / 100, 3)
+
+            parent = block.getparent()
+            for ancestor, share in ((parent, 1.0), (parent.getparent() if parent is not None else None, 0.5)):
+                if ancestor is None:
+                    continue
+                scores[ancestor] = scores.get(ancestor, 0.0) + points * share
+                lengths[ancestor] = lengths.get(ancestor, 0) + len(text)
+                link_lengths[ancestor] = link_lengths.get(ancestor, 0) + links
+
+        best, best_score = None, 0.0
+        for candidate, score in scores.items():
+            link_density = link_lengths[candidate] / lengths[candidate] if lengths[candidate] else 0.0
+            score *= self._class_weight(candidate) * (1 - link_density)
+            if score > best_score:
+                best, best_score = candidate, score
+        return best
+
+    def extract(self, content):
+        """Return {'title', 'text', 'authors'} for an HTML document (bytes or str)"""
+        root = self._parse(content)
+
+        for element in _BOILERPLATE(root):
+            element.drop_tree()
+
+        title = _TITLE(root)
+        title_text = clean_whitespace(title[0].text_content()) if title else 'Webpage'
+
+        main_content = None
+        for selector in _MAIN_CONTENT:
+            found = selector(root)
+            if found and len(found[0].text_content().strip()) >= MIN_MAIN_CONTENT_CHARS:
+                main_content = found[0]
+                break
+
+        if main_content is None:
+            main_content = self._best_candidate(root)
+
+        if main_content is None:
+            body = _BODY(root)
+            main_content = body[0] if body else root
+
+        text_parts = [text for text in (_block_text(block) for block in main_content.iter(*TEXT_BLOCK_TAGS)) if text]
+        text = ' '.join(text_parts) if text_parts else main_content.text_content()
+
+        authors = _AUTHOR_META(root)
+        author = authors[0].strip() if authors else 'Unknown'
+
+        return {'title': title_text, 'text': clean_whitespace(text), 'authors': author}
+
+
+# ==================== REGISTRY ====================
+
+EXTRACTORS = {
+    BeautifulSoupExtractor.name: BeautifulSoupExtractor,
+    LxmlExtractor.name: LxmlExtractor,
+}
+
+
+def get_extractor(name='lxml'):
+    """Instantiate an extraction engine by name, falling back to BeautifulSoup without lxml"""
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown HTML extractor: {name} (choose from {', '.join(sorted(EXTRACTORS))})")
+    if name == LxmlExtractor.name and not LXML_AVAILABLE:
+        logger.warning("lxml is not installed; using the BeautifulSoup extractor")
+        name = BeautifulSoupExtractor.name
+    return EXTRACTORS[name]()
@@ -0,0 +1,256 @@
+"""
+Background Job Queue for SmartNotes AI
+Runs long summarizations outside the request thread using a durable SQLite-backed queue
+"""
+
+import os
+import socket
+import threading
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from models import db, SummaryJob
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+
+class JobQueue:
+    """Durable job queue with a pool of worker threads
+
+    Jobs live in the summary_jobs table, so queued work survives restarts. Running
+    jobs are heartbeated; a job whose heartbeat goes stale (its worker process died)
+    is put back on the queue until it runs out of attempts.
+    """
+
+    def __init__(self, app, num_workers=2, poll_interval=1.0, heartbeat_interval=15,
+                 heartbeat_timeout=120, result_retention=timedelta(hours=24), max_attempts=3):
+        self.app = app
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.result_retention = result_retention
+        self.max_attempts = max_attempts
+
+        self.handlers = {}
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._active_jobs = set()
+        self._active_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def register(self, job_type, handler):
+        """Register a handler called as handler(job, progress_callback) -> result dict"""
+        self.handlers[job_type] = handler
+
+    def start(self):
+        """Recover abandoned jobs and start the worker and maintenance threads"""
+        if self._threads:
+            return
+
+        with self.app.app_context():
+            self._requeue_stale_jobs()
+
+        for i in range(self.num_workers):
+            thread = threading.Thread(
+                target=self._worker_loop,
+                args=(f"{self.worker_prefix}:{i}",),
+                name=f"job-worker-{i}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        maintenance = threading.Thread(target=self._maintenance_loop, name="job-maintenance", daemon=True)
+        maintenance.start()
+        self._threads.append(maintenance)
+
+        logger.info(f"Job queue started with {self.num_workers} workers")
+
+    def stop(self, timeout=5):
+        """Signal all threads to stop and wait briefly for them"""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, job_type, user_id, payload):
+        """Persist a new job and wake a worker; returns the job id"""
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        job = SummaryJob(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            job_type=job_type,
+            status=JOB_QUEUED,
+            payload=payload,
+            max_attempts=self.max_attempts
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        self._wakeup.set()
+        return job.id
+
+    def get(self, job_id, user_id=None):
+        """Load a job, optionally restricted to its owner"""
+        query = SummaryJob.query.filter_by(id=job_id)
+        if user_id is not None:
+            query = query.filter_by(user_id=user_id)
+        return query.first()
+
+    # ==================== WORKERS ====================
+
+    def _worker_loop(self, worker_id):
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    job_id = self._claim_next(worker_id)
+                    if job_id:
+                        self._run_job(job_id, worker_id)
+                        continue
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} error: {e}")
+
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _claim_next(self, worker_id):
+        """Atomically move the oldest queued job to running for this worker"""
+        candidates = SummaryJob.query.filter_by(status=JOB_QUEUED).order_by(
+            SummaryJob.created_at
+        ).with_entities(SummaryJob.id).limit(5).all()
+
+        for (job_id,) in candidates:
+            now = datetime.utcnow()
+            claimed = SummaryJob.query.filter_by(id=job_id, status=JOB_QUEUED).update({
+                'status': JOB_RUNNING,
+                'worker_id': worker_id,
+                'started_at': now,
+                'heartbeat_at': now,
+                'attempts': SummaryJob.attempts + 1
+            }, synchronize_session=False)
+            db.session.commit()
+
+            if claimed:
+                return job_id
+
+        return None
+
+    def _run_job(self, job_id, worker_id):
+        job = SummaryJob.query.get(job_id)
+        handler = self.handlers.get(job.job_type)
+
+        with self._active_lock:
+            self._active_jobs.add(job_id)
+
+        def report_progress(fraction):
+            # Handlers may report from another thread (e.g. an inference worker),
+            # so progress is written through its own app context and session
+            progress = max(0.0, min(100.0, fraction * 100))
+            with self.app.app_context():
+                SummaryJob.query.filter_by(id=job_id, worker_id=worker_id).update({
+                    'progress': progress,
+                    'heartbeat_at': datetime.utcnow()
+                }, synchronize_session=False)
+                db.session.commit()
+
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job type: {job.job_type}")
+
+            logger.info(f"Running job {job_id} ({job.job_type}) on {worker_id}, attempt {job.attempts}")
+            result = handler(job, report_progress)
+
+            job.status = JOB_COMPLETED
+            job.progress = 100
+            job.result = result
+            job.error = None
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            logger.info(f"Job {job_id} completed")
+
+        except Exception as e:
+            db.session.rollback()
+            job = SummaryJob.query.get(job_id)
+            logger.error(f"Job {job_id} failed on attempt {job.attempts}: {e}")
+
+            if job.attempts < job.max_attempts:
+                job.status = JOB_QUEUED
+                job.worker_id = None
+            else:
+                job.status = JOB_FAILED
+                job.finished_at = datetime.utcnow()
+            job.error = str(e)
+            db.session.commit()
+
+        finally:
+            with self._active_lock:
+                self._active_jobs.discard(job_id)
+
+    # ==================== MAINTENANCE ====================
+
+    def _maintenance_loop(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            with self.app.app_context():
+                try:
+                    self._heartbeat_active_jobs()
+                    self._requeue_stale_jobs()
+                    self._purge_expired_results()
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Job maintenance error: {e}")
+
+    def _heartbeat_active_jobs(self):
+        with self._active_lock:
+            active = list(self._active_jobs)
+
+        if active:
+            SummaryJob.query.filter(SummaryJob.id.in_(active)).update({
+                'heartbeat_at': datetime.utcnow()
+            }, synchronize_session=False)
+            db.session.commit()
+
+    def _requeue_stale_jobs(self):
+        """Recover running jobs whose worker stopped heartbeating"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.heartbeat_timeout)
+        stale = SummaryJob.query.filter(
+            SummaryJob.status == JOB_RUNNING,
+            SummaryJob.heartbeat_at < cutoff
+        ).all()
+
+        for job in stale:
+            if job.attempts < job.max_attempts:
+                logger.warning(f"Requeueing abandoned job {job.id} (worker {job.worker_id})")
+                job.status = JOB_QUEUED
+                job.worker_id = None
+            else:
+                logger.warning(f"Job {job.id} abandoned after {job.attempts} attempts")
+                job.status = JOB_FAILED
+                job.error = 'Worker stopped responding'
+                job.finished_at = datetime.utcnow()
+
+        if stale:
+            db.session.commit()
+            self._wakeup.set()
+
+    def _purge_expired_results(self):
+        cutoff = datetime.utcnow() - self.result_retention
+        purged = SummaryJob.query.filter(
+            SummaryJob.status.in_([JOB_COMPLETED, JOB_FAILED]),
+            SummaryJob.finished_at < cutoff
+        ).delete(synchronize_session=False)
+        db.session.commit()
+
+        if purged:
+            logger.info(f"Purged {purged} expired jobs")
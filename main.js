@@ -52,6 +52,9 @@ let currentOriginalText = '';
 let currentContentType = 'text';
 let currentContentSource = null;
 let currentMetadata = {};
+let currentHistoryId = null;
+let currentDocumentId = null;
+let currentDocumentPreview = '';
 let supportedLanguages = {};
 let currentDetectedLanguage = 'en';
 let isFileUploaded = false;
@@ -404,8 +407,12 @@ async function uploadFile(file) {
         const result = await response.json();
         
         if (result.success) {
-            noteInput.value = result.text;
-            currentOriginalText = result.text;
+            // The extracted text stays on the server; only a preview comes back
+            discardDocument();
+            noteInput.value = result.preview;
+            currentOriginalText = result.preview;
+            currentDocumentId = result.document_id;
+            currentDocumentPreview = result.preview.trim();
             currentContentType = 'file';
             currentContentSource = result.filename;
             
@@ -422,6 +429,7 @@ async function uploadFile(file) {
             
             isFileUploaded = true;
             updateWordCount();
+            wordCount.textContent = result.word_count;
             validateForm();
             
             showToastMessage(`✓ File processed: ${result.word_count.toLocaleString()} words extracted`, 'success');
@@ -482,6 +490,7 @@ function removeFile() {
         currentContentType = 'text';
         currentContentSource = null;
         currentMetadata = {};
+        discardDocument();
         isFileUploaded = false;
         updateWordCount();
         validateForm();
@@ -491,6 +500,27 @@ function removeFile() {
 }
 
 // ==================== SUMMARIZATION ====================
+function textOrDocument(text) {
+    // Send the upload's handle instead of the text; edits to the preview are sent
+    // alongside it and replace only the previewed part of the stored document
+    if (!currentDocumentId) {
+        return { text: text };
+    }
+    if (text === currentDocumentPreview) {
+        return { document_id: currentDocumentId };
+    }
+    return { document_id: currentDocumentId, edited_preview: noteInput.value };
+}
+
+function discardDocument() {
+    // Free the server-side copy of an upload the user is done with
+    if (currentDocumentId) {
+        fetch(`/documents/${encodeURIComponent(currentDocumentId)}`, { method: 'DELETE' }).catch(() => {});
+    }
+    currentDocumentId = null;
+    currentDocumentPreview = '';
+}
+
 async function summarizeText() {
     const text = noteInput.value.trim();
     
@@ -508,7 +538,7 @@ async function summarizeText() {
     
     try {
         const requestData = {
-            text: text,
+            ...textOrDocument(text),
             max_length: parseInt(maxLength.value),
             min_length: parseInt(minLength.value),
             summary_type: summaryType.value,
@@ -521,17 +551,28 @@ async function summarizeText() {
             requestData.target_language = targetLanguage.value;
         }
         
+        // Key points extracted earlier for this same text belong in the saved
+        // history row, since report downloads are rendered from it
+        if (currentKeyPoints.length > 0 && text === currentOriginalText.trim()) {
+            requestData.key_points = currentKeyPoints;
+        }
+        
         const response = await fetch('/summarize', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify(requestData)
         });
         
-        const result = await response.json();
+        let result = await response.json();
+        
+        if (response.status === 202 && result.job_id) {
+            result = await waitForJob(result.job_id);
+        }
         
         if (result.success) {
             currentSummary = result.summary;
             currentOriginalText = text;
+            currentHistoryId = result.history_id || null;
             
             displaySummary(result);
             showOutputSection();
@@ -549,6 +590,31 @@ async function summarizeText() {
     }
 }
 
+async function waitForJob(jobId) {
+    // Poll a background summarization job until it finishes
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, 2000));
+        
+        const response = await fetch(`/jobs/${jobId}`);
+        const status = await response.json();
+        
+        if (!status.success) {
+            return status;
+        }
+        
+        if (status.status === 'completed') {
+            const resultResponse = await fetch(`/jobs/${jobId}/result`);
+            return await resultResponse.json();
+        }
+        
+        if (status.status === 'failed') {
+            return { success: false, error: status.error || 'Summarization job failed' };
+        }
+        
+        loadingText.textContent = `Generating AI summary... ${Math.round(status.progress || 0)}%`;
+    }
+}
+
 async function extractKeyPoints() {
     const text = noteInput.value.trim();
     
@@ -561,10 +627,15 @@ async function extractKeyPoints() {
     
     try {
         const requestData = {
-            text: text,
+            ...textOrDocument(text),
             num_points: 5
         };
         
+        // Lets the server attach the key points to the saved summary's reports
+        if (currentHistoryId && text === currentOriginalText) {
+            requestData.history_id = currentHistoryId;
+        }
+        
         if (targetLanguage.value) {
             requestData.target_language = targetLanguage.value;
         }
@@ -579,6 +650,10 @@ async function extractKeyPoints() {
         
         if (result.success) {
             currentKeyPoints = result.key_points;
+            if (!requestData.history_id) {
+                // Key points for different text: the saved summary's report no longer matches
+                currentHistoryId = null;
+            }
             currentOriginalText = text;
             
             displayKeyPoints(result.key_points);
@@ -668,6 +743,8 @@ function clearAll() {
     currentContentType = 'text';
     currentContentSource = null;
     currentMetadata = {};
+    currentHistoryId = null;
+    discardDocument();
     
     clearUrlData();
     removeFile();
@@ -719,16 +796,19 @@ async function downloadPdf() {
     try {
         const metadata = { ...currentMetadata };
         
-        const response = await fetch('/download-pdf', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                original_text: currentOriginalText,
-                summary: currentSummary,
-                key_points: currentKeyPoints,
-                metadata: metadata
-            })
-        });
+        // Saved summaries are rendered server-side from history; no need to re-send the text
+        const response = currentHistoryId
+            ? await fetch(`/api/history/${currentHistoryId}/report.pdf`)
+            : await fetch('/download-pdf', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    original_text: currentOriginalText,
+                    summary: currentSummary,
+                    key_points: currentKeyPoints,
+                    metadata: metadata
+                })
+            });
         
         if (response.ok) {
             const blob = await response.blob();
@@ -764,16 +844,18 @@ async function downloadText() {
     try {
         const metadata = { ...currentMetadata };
         
-        const response = await fetch('/download-text', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                summary: currentSummary,
-                key_points: currentKeyPoints,
-                metadata: metadata,
-                original_filename: currentMetadata.filename || currentContentType
-            })
-        });
+        const response = currentHistoryId
+            ? await fetch(`/api/history/${currentHistoryId}/report.txt`)
+            : await fetch('/download-text', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    summary: currentSummary,
+                    key_points: currentKeyPoints,
+                    metadata: metadata,
+                    original_filename: currentMetadata.filename || currentContentType
+                })
+            });
         
         if (response.ok) {
             const blob = await response.blob();
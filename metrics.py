@@ -0,0 +1,394 @@
+"""
+Metrics Module for SmartNotes AI
+Prometheus-format counters, gauges and histograms with per-thread shards
+"""
+
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Sharded:
+    """Per-thread value storage
+
+    Each thread only ever writes its own shard, so hot-path updates need no lock;
+    the lock is taken only the first time a thread touches the metric. A scrape
+    sums the shards without blocking writers.
+    """
+
+    def __init__(self, size):
+        self._size = size
+        self._shards = {}
+        self._lock = threading.Lock()
+
+    def shard(self):
+        ident = threading.get_ident()
+        shard = self._shards.get(ident)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.setdefault(ident, [0] * self._size)
+        return shard
+
+    def totals(self):
+        totals = [0] * self._size
+        for shard in list(self._shards.values()):
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class _CounterChild(_Sharded):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount=1):
+        self.shard()[0] += amount
+
+    def value(self):
+        return self.totals()[0]
+
+
+class _HistogramChild(_Sharded):
+    def __init__(self, buckets):
+        # One slot per bucket, then +Inf, sum and count
+        super().__init__(len(buckets) + 3)
+        self.buckets = buckets
+
+    def observe(self, value):
+        shard = self.shard()
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        shard[index] += 1
+        shard[-2] += value
+        shard[-1] += 1
+
+    def time(self):
+        return _Timer(self)
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._value = 0
+
+    def set(self, value):
+        self._value = value
+
+    def inc(self, amount=1):
+        self._value += amount
+
+    def dec(self, amount=1):
+        self._value -= amount
+
+    def value(self):
+        return self._value
+
+
+class _Timer:
+    """Context manager observing elapsed seconds into a histogram"""
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _Metric:
+    metric_type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values, **kwargs):
+        """Return the child metric for one combination of label values"""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def _default(self):
+        return self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self):
+        raise NotImplementedError
+
+    def _labelled(self):
+        for key, child in list(self._children.items()):
+            yield list(zip(self.labelnames, key)), child
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    metric_type = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def samples(self):
+        for labels, child in self._labelled():
+            yield '', labels, child.value()
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, optionally read from a callback at scrape time
+
+    A callback may return a number or a dict mapping label-value tuples to numbers.
+    """
+    metric_type = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None, callback=None):
+        self.callback = callback
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def dec(self, amount=1):
+        self._default().dec(amount)
+
+    def samples(self):
+        if self.callback is not None:
+            try:
+                values = self.callback()
+            except Exception as e:
+                logger.warning(f"Metric callback for {self.name} failed: {e}")
+                return
+            if isinstance(values, dict):
+                for key, value in values.items():
+                    key = key if isinstance(key, tuple) else (key,)
+                    yield '', list(zip(self.labelnames, key)), value
+            elif values is not None:
+                yield '', [], values
+            return
+
+        for labels, child in self._labelled():
+            yield '', labels, child.value()
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def samples(self):
+        for labels, child in self._labelled():
+            totals = child.totals()
+            yield from histogram_samples(self.buckets, totals[:-2], totals[-2], totals[-1], labels)
+
+
+def histogram_samples(buckets, counts, total_sum, total_count, labels=()):
+    """Cumulative bucket, sum and count samples from per-bucket counts"""
+    labels = list(labels)
+    cumulative = 0
+    for bound, count in zip(list(buckets) + [float('inf')], counts):
+        cumulative += count
+        yield '_bucket', labels + [('le', _format_value(float(bound)))], cumulative
+    yield '_sum', labels, total_sum
+    yield '_count', labels, total_count
+
+
+class Collector:
+    """Metric family produced entirely at scrape time by a function
+
+    The function returns an iterable of (suffix, labels, value) samples.
+    """
+
+    def __init__(self, name, documentation, metric_type, collect, registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.collect = collect
+        (registry or REGISTRY).register(self)
+
+    def samples(self):
+        try:
+            yield from self.collect()
+        except Exception as e:
+            logger.warning(f"Metric collector {self.name} failed: {e}")
+
+
+class Registry:
+    """Set of metrics rendered together by the /metrics endpoint"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.metric_type}')
+            for suffix, labels, value in metric.samples():
+                lines.append(f'{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# ==================== APPLICATION METRICS ====================
+
+HTTP_REQUESTS = Counter(
+    'smartnotes_http_requests_total',
+    'HTTP requests by route, method and status',
+    ['route', 'method', 'status']
+)
+
+HTTP_LATENCY = Histogram(
+    'smartnotes_http_request_duration_seconds',
+    'HTTP request latency by route',
+    ['route', 'method']
+)
+
+EXTRACTION_DURATION = Histogram(
+    'smartnotes_extraction_duration_seconds',
+    'Text extraction time by source type',
+    ['file_type']
+)
+
+DB_QUERIES = Counter(
+    'smartnotes_db_queries_total',
+    'SQL statements executed by statement type',
+    ['statement']
+)
+
+DB_QUERY_DURATION = Histogram(
+    'smartnotes_db_query_duration_seconds',
+    'SQL statement execution time by statement type',
+    ['statement'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+
+PDF_PAGES = Counter(
+    'smartnotes_pdf_pages_extracted_total',
+    'PDF pages extracted by extraction engine',
+    ['engine']
+)
+
+HTTP_CLIENT_REQUESTS = Counter(
+    'smartnotes_http_client_requests_total',
+    'Outbound HTTP requests by outcome (status class or error)',
+    ['outcome']
+)
+
+HTTP_CLIENT_CONNECTIONS = Counter(
+    'smartnotes_http_client_connections_total',
+    'Outbound HTTP connections opened; requests beyond this count reused keep-alive connections',
+    ['scheme']
+)
+
+HTTP_CLIENT_RETRIES = Counter(
+    'smartnotes_http_client_retries_total',
+    'Outbound HTTP retries by reason',
+    ['reason']
+)
+
+HTTP_CLIENT_ABORTS = Counter(
+    'smartnotes_http_client_aborts_total',
+    'Outbound HTTP downloads abandoned before or while reading the body',
+    ['reason']
+)
+
+HTTP_CLIENT_DURATION = Histogram(
+    'smartnotes_http_client_request_duration_seconds',
+    'Outbound HTTP request time including retries'
+)
+
+CACHE_LOOKUPS = Counter(
+    'smartnotes_cache_lookups_total',
+    'Cache lookups by cache name and result (hit/miss)',
+    ['cache', 'result']
+)
+
+
+def instrument_sqlalchemy(engine):
+    """Count and time every SQL statement executed through an engine"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('smartnotes_query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('smartnotes_query_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'OTHER'
+        DB_QUERIES.labels(kind).inc()
+        DB_QUERY_DURATION.labels(kind).observe(elapsed)
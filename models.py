@@ -111,4 +111,48 @@ class SummaryHistory(db.Model):
         }
     
     def __repr__(self):
-        return f'<SummaryHistory {self.id} - User {self.user_id} - {self.content_type}>'
\ No newline at end of file
+        return f'<SummaryHistory {self.id} - User {self.user_id} - {self.content_type}>'
+
+class SummaryJob(db.Model):
+    """Background summarization job persisted so it survives worker restarts"""
+    __tablename__ = 'summary_jobs'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    job_type = db.Column(db.String(50), nullable=False, default='summarize')
+    
+    # queued, running, completed, failed
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)
+    progress = db.Column(db.Float, default=0)
+    
+    payload = db.Column(db.JSON)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    
+    # Retry bookkeeping
+    attempts = db.Column(db.Integer, default=0)
+    max_attempts = db.Column(db.Integer, default=3)
+    worker_id = db.Column(db.String(100))
+    heartbeat_at = db.Column(db.DateTime)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime, index=True)
+    
+    def to_dict(self):
+        """Convert to dictionary for JSON status response (without the result)"""
+        return {
+            'job_id': self.id,
+            'job_type': self.job_type,
+            'status': self.status,
+            'progress': round(self.progress or 0, 1),
+            'error': self.error,
+            'attempts': self.attempts,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f'<SummaryJob {self.id} - {self.status}>'
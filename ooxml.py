@@ -0,0 +1,190 @@
+"""
+OOXML Streaming Extraction Module for SmartNotes AI
+Reads DOCX and PPTX text straight from the zip parts with an incremental XML parser
+"""
+
+import posixpath
+import zipfile
+import logging
+import xml.etree.ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+A = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+P = '{http://schemas.openxmlformats.org/presentationml/2006/main}'
+R = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+DOCX_BODY_PART = 'word/document.xml'
+PPTX_PRESENTATION_PART = 'ppt/presentation.xml'
+PPTX_PRESENTATION_RELS = 'ppt/_rels/presentation.xml.rels'
+
+
+def _open_package(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return zipfile.ZipFile(source)
+
+
+# ==================== DOCX ====================
+
+def iter_docx_blocks(source):
+    """Yield the text of each body paragraph and table cell in document order
+
+    source is a path or binary file object. Cells continuing a vertical merge are
+    skipped, so merged cells are emitted once; paragraphs inside a cell (including
+    nested tables) are folded into that cell's text. Parsed elements are discarded
+    as soon as they are handled, so memory stays flat for any document size.
+    """
+    with _open_package(source) as package, package.open(DOCX_BODY_PART) as part:
+        depth = 0
+        body = None
+        cells = []       # stack of [paragraph texts] for open table cells
+        skip_cell = []   # parallel stack: True for vMerge continuation cells
+        runs = []        # stack of run texts per open paragraph (text boxes nest them)
+        open_tags = []   # tags of the currently open elements
+
+        for event, elem in ET.iterparse(part, events=('start', 'end')):
+            tag = elem.tag
+
+            if event == 'start':
+                depth += 1
+                open_tags.append(tag)
+                if tag == W + 'body':
+                    body = elem
+                elif tag == W + 'tc':
+                    cells.append([])
+                    skip_cell.append(False)
+                elif tag == W + 'p':
+                    runs.append([])
+                continue
+
+            depth -= 1
+            open_tags.pop()
+
+            if tag == W + 't':
+                if runs:
+                    runs[-1].append(elem.text or '')
+            elif tag == W + 'tab':
+                # <w:tab/> in a run is a tab character; under <w:tabs> it defines a tab stop
+                if runs and open_tags and open_tags[-1] == W + 'r':
+                    runs[-1].append('\t')
+            elif tag in (W + 'br', W + 'cr'):
+                if runs:
+                    runs[-1].append('\n')
+            elif tag == W + 'vMerge' and cells:
+                # <w:vMerge/> without val="restart" continues the cell above
+                if elem.get(W + 'val', 'continue') != 'restart':
+                    skip_cell[-1] = True
+            elif tag == W + 'p':
+                text = ''.join(runs.pop())
+                if cells:
+                    if text.strip():
+                        cells[-1].append(text)
+                elif text.strip():
+                    yield text
+            elif tag == W + 'tc':
+                texts = cells.pop()
+                skipped = skip_cell.pop()
+                if skipped or not texts:
+                    pass
+                elif cells:
+                    cells[-1].extend(texts)
+                else:
+                    yield '\n'.join(texts)
+
+            # document=1, body=2: drop finished top-level blocks from the tree
+            if depth == 2 and body is not None:
+                body.remove(elem)
+            if tag in (W + 'p', W + 'tbl'):
+                elem.clear()
+
+
+# ==================== PPTX ====================
+
+def _slide_parts(package):
+    """Slide part names in presentation order"""
+    with package.open(PPTX_PRESENTATION_RELS) as rels_part:
+        targets = {
+            rel.get('Id'): rel.get('Target')
+            for rel in ET.parse(rels_part).getroot().iter(PKG_REL + 'Relationship')
+        }
+
+    parts = []
+    with package.open(PPTX_PRESENTATION_PART) as presentation_part:
+        for event, elem in ET.iterparse(presentation_part, events=('end',)):
+            if elem.tag == P + 'sldId':
+                target = targets.get(elem.get(R + 'id'))
+                if target:
+                    parts.append(posixpath.normpath(posixpath.join('ppt', target)))
+            elif elem.tag == P + 'sldIdLst':
+                break
+    return parts
+
+
+def _slide_blocks(part):
+    """Text blocks of one slide: one per text shape, one per table row"""
+    shape_paragraphs = []
+    row_cells = None
+    cell_paragraphs = None
+    skip_cell = False
+    runs = []
+
+    for event, elem in ET.iterparse(part, events=('start', 'end')):
+        tag = elem.tag
+
+        if event == 'start':
+            if tag == A + 'tr':
+                row_cells = []
+            elif tag == A + 'tc':
+                cell_paragraphs = []
+                # Cells covered by a merge repeat nothing useful
+                skip_cell = elem.get('hMerge') in ('1', 'true') or elem.get('vMerge') in ('1', 'true')
+            elif tag == A + 'p':
+                runs = []
+            continue
+
+        if tag == A + 't':
+            runs.append(elem.text or '')
+        elif tag == A + 'br':
+            runs.append('\n')
+        elif tag == A + 'p':
+            text = ''.join(runs)
+            runs = []
+            if text.strip():
+                if cell_paragraphs is not None:
+                    cell_paragraphs.append(text.strip())
+                else:
+                    shape_paragraphs.append(text)
+        elif tag == A + 'tc':
+            if cell_paragraphs and not skip_cell:
+                row_cells.append(' '.join(cell_paragraphs))
+            cell_paragraphs = None
+        elif tag == A + 'tr':
+            if row_cells:
+                yield ' | '.join(row_cells)
+            row_cells = None
+        elif tag == P + 'sp':
+            if shape_paragraphs:
+                yield '\n'.join(shape_paragraphs)
+            shape_paragraphs = []
+            elem.clear()
+        elif tag in (P + 'graphicFrame', P + 'grpSp'):
+            elem.clear()
+
+
+def iter_pptx_slides(source):
+    """Yield (slide_number, [text blocks]) for each slide in presentation order
+
+    Slides are parsed one at a time from the package; table cells hidden under a
+    horizontal or vertical merge are skipped.
+    """
+    with _open_package(source) as package:
+        for number, name in enumerate(_slide_parts(package), 1):
+            try:
+                with package.open(name) as part:
+                    yield number, list(_slide_blocks(part))
+            except KeyError:
+                logger.warning(f"Slide part missing from package: {name}")
+                yield number, []
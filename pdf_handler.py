@@ -6,21 +6,273 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_JUSTIFY, TA_LEFT, TA_CENTER
-import tempfile
 import os
+import io
+import re
+import json
+import hashlib
+import mmap
+import codecs
+import time
+import threading
+import multiprocessing
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from docx import Document
-from pptx import Presentation
 import logging
+import tracing
+import metrics
+from ooxml import iter_docx_blocks, iter_pptx_slides
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever report layout changes; it is part of the rendered report cache key
+REPORT_TEMPLATE_VERSION = 2
+
+# Bump whenever extracted text changes for the same input; it is part of the extraction cache key
+EXTRACTOR_VERSION = 5
+
+# Documents shorter than this are extracted in-process; pool dispatch isn't worth it
+PARALLEL_MIN_PAGES = 16
+PAGES_PER_TASK = 8
+
+# Fast-extractor output below these thresholds is escalated to pdfplumber
+MIN_PAGE_CHARS = 20
+MAX_UNPRINTABLE_RATIO = 0.05
+MAX_SINGLE_CHAR_TOKEN_RATIO = 0.4
+MAX_AVERAGE_TOKEN_LENGTH = 25
+# Scripts written without spaces between words (Han, kana, Thai, Lao, Myanmar,
+# Khmer) plus CJK punctuation; token-shape checks cannot judge them
+UNSPACED_SCRIPT = re.compile(
+    '[\u0e00-\u0eff\u1000-\u109f\u1780-\u17ff\u3000-\u30ff\u3400-\u4dbf'
+    '\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]'
+)
+
+
+def _page_text_is_poor(text):
+    """Heuristic check for empty, garbled or layout-mangled page text"""
+    stripped = text.strip() if text else ''
+    if len(stripped) < MIN_PAGE_CHARS:
+        return True
+    
+    # Unmapped glyphs come out as (cid:NN) or replacement/control characters
+    unprintable = stripped.count('(cid:') + sum(
+        1 for ch in stripped if ch == '\ufffd' or not (ch.isprintable() or ch.isspace())
+    )
+    if unprintable / len(stripped) > MAX_UNPRINTABLE_RATIO:
+        return True
+    
+    # Token shape only means something for space-delimited text, so skip it on
+    # pages that are mostly Chinese, Japanese, Thai and the like
+    spaced = UNSPACED_SCRIPT.sub(' ', stripped)
+    tokens = spaced.split()
+    if not tokens or sum(len(token) for token in tokens) * 2 < len(''.join(stripped.split())):
+        return False
+    
+    # Letters spaced apart ("T h e  e n d") or columns run together ("Theendofthe...")
+    single_chars = sum(1 for token in tokens if len(token) == 1)
+    if single_chars / len(tokens) > MAX_SINGLE_CHAR_TOKEN_RATIO:
+        return True
+    if sum(len(token) for token in tokens) / len(tokens) > MAX_AVERAGE_TOKEN_LENGTH:
+        return True
+    
+    return False
+
+
+def _as_source(source):
+    """Normalize an extraction source to a filesystem path or immutable bytes"""
+    if isinstance(source, (str, os.PathLike)):
+        return source
+    if hasattr(source, 'read'):
+        source.seek(0)
+        return source.read()
+    return bytes(source)
+
+
+def _open_source(source):
+    """Fresh binary stream over a source, so each parser keeps its own file position"""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, 'rb')
+    # BytesIO over bytes shares the buffer until written to
+    return io.BytesIO(source)
+
+
+def _count_pages(source):
+    try:
+        with _open_source(source) as stream:
+            return len(PyPDF2.PdfReader(stream).pages)
+    except Exception as e:
+        logger.warning(f"PyPDF2 could not read page count, using pdfplumber: {e}")
+        with _open_source(source) as stream, pdfplumber.open(stream) as pdf:
+            return len(pdf.pages)
+
+
+def parse_page_ranges(spec):
+    """Parse a page range spec like '1-5,8,12-' into 0-based (start, stop) ranges
+    
+    Page numbers are 1-based and inclusive; stop is None for an open-ended range.
+    Raises ValueError for malformed specs.
+    """
+    ranges = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition('-')
+        try:
+            start = int(first) if first.strip() else 1
+            stop = (int(last) if last.strip() else None) if dash else start
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part}")
+        if start < 1 or (stop is not None and stop < start):
+            raise ValueError(f"Invalid page range: {part}")
+        ranges.append((start - 1, stop))
+    
+    if not ranges:
+        raise ValueError("Empty page range")
+    return ranges
+
+
+def _select_pages(page_ranges, page_count):
+    """Sorted 0-based page numbers covered by page_ranges, clipped to the document"""
+    if page_ranges is None:
+        return list(range(page_count))
+    numbers = set()
+    for start, stop in page_ranges:
+        end = page_count if stop is None else min(stop, page_count)
+        numbers.update(range(start, end))
+    return sorted(numbers)
+
+
+def _iter_page_texts(source, numbers):
+    """Yield (page_number, text, engine) for the given 0-based pages, in order
+    
+    Every page goes through PyPDF2 first; pdfplumber is opened only if some page's
+    fast output looks poor, and only those pages are re-extracted with it.
+    """
+    plumber = None
+    plumber_stream = None
+    
+    try:
+        with _open_source(source) as stream:
+            try:
+                reader = PyPDF2.PdfReader(stream)
+            except Exception as e:
+                logger.warning(f"PyPDF2 could not open PDF, using pdfplumber for all pages: {e}")
+                reader = None
+            
+            for number in numbers:
+                text = ''
+                if reader is not None:
+                    try:
+                        text = reader.pages[number].extract_text() or ''
+                    except Exception as e:
+                        logger.debug(f"PyPDF2 failed on page {number + 1}: {e}")
+                
+                if not _page_text_is_poor(text):
+                    yield number + 1, text, 'pypdf2'
+                    continue
+                
+                if plumber is None:
+                    plumber_stream = _open_source(source)
+                    plumber = pdfplumber.open(plumber_stream)
+                try:
+                    fallback = plumber.pages[number].extract_text() or ''
+                except Exception as e:
+                    logger.debug(f"pdfplumber failed on page {number + 1}: {e}")
+                    fallback = ''
+                
+                if fallback.strip():
+                    yield number + 1, fallback, 'pdfplumber'
+                else:
+                    yield number + 1, text, 'pypdf2'
+    finally:
+        if plumber is not None:
+            plumber.close()
+        if plumber_stream is not None:
+            plumber_stream.close()
+
+
+def _extract_pages(source, numbers):
+    """Process pool worker: list form of _iter_page_texts"""
+    return list(_iter_page_texts(source, numbers))
+
+
+# Text files at least this large are memory-mapped instead of read into memory
+TEXT_MMAP_THRESHOLD = 1024 * 1024
+TEXT_DECODE_CHUNK = 1024 * 1024
+
+# Longest first: the UTF-32 LE BOM starts with the UTF-16 LE one
+TEXT_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+
+def _guess_utf16(data):
+    """Endianness of BOM-less UTF-16 judged by NUL bytes in a sample, or None"""
+    sample = bytes(data[:4096])
+    if len(sample) < 4:
+        return None
+    even_nuls = sample[0::2].count(0)
+    odd_nuls = sample[1::2].count(0)
+    half = len(sample) // 2
+    # Mostly-ASCII UTF-16 has a NUL in every other byte
+    if odd_nuls > half * 0.3 and even_nuls < half * 0.05:
+        return 'utf-16-le'
+    if even_nuls > half * 0.3 and odd_nuls < half * 0.05:
+        return 'utf-16-be'
+    return None
+
+
+def _decode_incremental(data, encoding):
+    """Decode a buffer chunk by chunk, failing at the first invalid byte"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='strict')
+    parts = []
+    for offset in range(0, len(data), TEXT_DECODE_CHUNK):
+        parts.append(decoder.decode(data[offset:offset + TEXT_DECODE_CHUNK]))
+    parts.append(decoder.decode(b'', final=True))
+    return ''.join(parts)
+
+
+def decode_text_bytes(data):
+    """Decode a bytes-like buffer, returning (text, encoding)
+    
+    A BOM decides the encoding outright. Otherwise BOM-less UTF-16 is tried when the
+    NUL pattern suggests it, then UTF-8 is validated incrementally, then cp1252, with
+    latin-1 as the fallback that cannot fail.
+    """
+    with memoryview(data) as view:
+        for bom, encoding in TEXT_BOMS:
+            if view[:len(bom)] == bom:
+                return _decode_incremental(view[len(bom):], encoding), encoding
+        
+        # NULs are valid UTF-8, so a UTF-16 looking buffer must be tried as UTF-16 first
+        utf16 = _guess_utf16(view)
+        candidates = [utf16, 'utf-8', 'cp1252'] if utf16 else ['utf-8', 'cp1252']
+        
+        for encoding in candidates:
+            try:
+                return _decode_incremental(view, encoding), encoding
+            except UnicodeDecodeError:
+                continue
+        
+        return _decode_incremental(view, 'latin-1'), 'latin-1'
+
+
 class PDFHandler:
     """Handle PDF operations - reading and writing"""
     
-    def __init__(self):
+    def __init__(self, extraction_workers=None, pages_per_task=PAGES_PER_TASK):
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
+        self.extraction_workers = extraction_workers or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task
+        self._pool = None
+        self._pool_lock = threading.Lock()
     
     def _setup_custom_styles(self):
         """Setup custom styles for PDF generation"""
@@ -64,63 +316,136 @@ class PDFHandler:
             spaceAfter=6
         ))
     
-    def extract_text_from_pdf(self, pdf_path):
-        """Extract text from PDF using multiple methods for better accuracy"""
-        text_content = ""
+    def _get_pool(self):
+        """Lazily start the extraction process pool"""
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn, not fork: the web process runs inference and job threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.extraction_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+    
+    def close(self):
+        """Shut down the extraction process pool"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+    
+    def iter_pages(self, source, page_ranges=None, page_count=None):
+        """Lazily yield (page_number, text, engine) in page order; page_number is 1-based
         
-        try:
-            # Try pdfplumber first (better for complex layouts)
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content += page_text + "\n"
-            
-            if text_content.strip():
-                logger.info(f"Successfully extracted text using pdfplumber: {len(text_content)} characters")
-                return text_content.strip()
+        source may be a file path, bytes-like object or binary file object, and
+        page_ranges a list from parse_page_ranges (default: every page). Long
+        documents are extracted on the process pool with at most one batch per
+        worker in flight, so closing the generator early leaves little wasted work.
+        """
+        source = _as_source(source)
+        if page_count is None:
+            page_count = _count_pages(source)
+        numbers = _select_pages(page_ranges, page_count)
         
-        except Exception as e:
-            logger.warning(f"pdfplumber extraction failed: {e}")
+        if self.extraction_workers <= 1 or len(numbers) < PARALLEL_MIN_PAGES:
+            yield from _iter_page_texts(source, numbers)
+            return
+        
+        if isinstance(source, bytes):
+            # In-memory documents are pickled to every task, so keep batches large
+            step = max(self.pages_per_task * 4, -(-len(numbers) // self.extraction_workers))
+        else:
+            step = self.pages_per_task
+        batches = [numbers[i:i + step] for i in range(0, len(numbers), step)]
+        
+        pool = self._get_pool()
+        pending = deque()
+        try:
+            for batch in batches:
+                pending.append(pool.submit(_extract_pages, source, batch))
+                if len(pending) >= self.extraction_workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+    
+    def extract_pages(self, source, page_ranges=None, page_count=None):
+        """(page_number, text, engine) for every selected page, in page order"""
+        return list(self.iter_pages(source, page_ranges, page_count))
+    
+    def extract_text_from_pdf(self, source, page_ranges=None, max_words=None):
+        """Extract text from a PDF path, bytes or file object, choosing the engine page by page
         
+        Extraction stops after the page on which max_words is reached.
+        """
         try:
-            # Fallback to PyPDF2
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
+            with tracing.span('pdf.extract') as span:
+                start = time.perf_counter()
+                source = _as_source(source)
+                page_count = _count_pages(source)
+                span.set_attribute('pages', page_count)
                 
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content += page_text + "\n"
-            
-            if text_content.strip():
-                logger.info(f"Successfully extracted text using PyPDF2: {len(text_content)} characters")
-                return text_content.strip()
+                page_texts = []
+                engines = Counter()
+                words = 0
+                pages = self.iter_pages(source, page_ranges, page_count)
+                try:
+                    for _, text, engine in pages:
+                        engines[engine] += 1
+                        if text:
+                            page_texts.append(text)
+                            words += len(text.split())
+                        if max_words and words >= max_words:
+                            break
+                finally:
+                    pages.close()
+                text_content = "\n".join(page_texts)
+                
+                extracted = sum(engines.values())
+                elapsed = time.perf_counter() - start
+                pages_per_second = extracted / elapsed if elapsed > 0 else 0.0
+                for engine, count in engines.items():
+                    metrics.PDF_PAGES.labels(engine).inc(count)
+                    span.set_attribute(f'pages.{engine}', count)
+                span.set_attribute('pages_extracted', extracted)
+                span.set_attribute('chars', len(text_content))
+                span.set_attribute('pages_per_second', round(pages_per_second, 1))
         
         except Exception as e:
-            logger.error(f"PyPDF2 extraction failed: {e}")
+            logger.error(f"PDF extraction failed: {e}")
+            raise Exception("Could not extract text from PDF. The file might be image-based or corrupted.")
         
         if not text_content.strip():
             raise Exception("Could not extract text from PDF. The file might be image-based or corrupted.")
         
+        logger.info(
+            f"Successfully extracted text from PDF: {len(text_content)} characters, {extracted} of {page_count} pages "
+            f"at {pages_per_second:.1f} pages/s ({dict(engines)})"
+        )
         return text_content.strip()
     
-    def generate_summary_report(self, original_text, summary, key_points, metadata=None, filename=None):
-        """Generate a comprehensive PDF report"""
+    def generate_summary_report(self, original_text, summary, key_points, metadata=None, filename=None,
+                                generated_on=None):
+        """Generate a comprehensive PDF report, returned as bytes
+        
+        With generated_on set the output is byte-for-byte reproducible: that time
+        is printed instead of the current one and ReportLab's invariant mode
+        fixes the embedded creation date and document id.
+        """
         try:
-            # Create temporary file
-            temp_file = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
-            temp_file.close()
+            buffer = io.BytesIO()
             
             # Create PDF document
             doc = SimpleDocTemplate(
-                temp_file.name,
+                buffer,
                 pagesize=A4,
                 rightMargin=72,
                 leftMargin=72,
                 topMargin=72,
-                bottomMargin=72
+                bottomMargin=72,
+                invariant=1 if generated_on else 0
             )
             
             # Build content
@@ -143,7 +468,7 @@ class PDFHandler:
                 if 'detected_language' in metadata:
                     metadata_data.append(['Detected Language:', metadata.get('language_name', 'Unknown')])
                 
-                metadata_data.append(['Generated On:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
+                metadata_data.append(['Generated On:', (generated_on or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')])
                 
                 metadata_table = Table(metadata_data, colWidths=[2*inch, 3*inch])
                 metadata_table.setStyle(TableStyle([
@@ -194,8 +519,9 @@ class PDFHandler:
             # Build PDF
             doc.build(story)
             
-            logger.info(f"PDF report generated successfully: {temp_file.name}")
-            return temp_file.name
+            report = buffer.getvalue()
+            logger.info(f"PDF report generated successfully: {len(report)} bytes")
+            return report
             
         except Exception as e:
             logger.error(f"Error generating PDF report: {e}")
@@ -204,44 +530,34 @@ class PDFHandler:
 class TextProcessor:
     """Handle text file operations and processing"""
     
-    def read_text_file(self, file_path):
-        """Read text from various text file formats"""
+    def read_text_file(self, source):
+        """Read text from a text file path or binary file object, reading the bytes once"""
         try:
-            # Try different encodings
-            encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
-            
-            for encoding in encodings:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as file:
-                        content = file.read()
-                        logger.info(f"Successfully read text file with {encoding} encoding")
-                        return content
-                except UnicodeDecodeError:
-                    continue
-            
-            raise Exception("Could not decode text file with any supported encoding")
+            if isinstance(source, io.BytesIO):
+                # Released explicitly: a live export stops the BytesIO from being closed
+                with source.getbuffer() as view:
+                    content, encoding = decode_text_bytes(view)
+            elif hasattr(source, 'read'):
+                source.seek(0)
+                content, encoding = decode_text_bytes(source.read())
+            elif os.path.getsize(source) >= TEXT_MMAP_THRESHOLD:
+                with open(source, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    content, encoding = decode_text_bytes(mapped)
+            else:
+                with open(source, 'rb') as file:
+                    content, encoding = decode_text_bytes(file.read())
+            
+            logger.info(f"Successfully read text file with {encoding} encoding")
+            return content
             
         except Exception as e:
             logger.error(f"Error reading text file: {e}")
             raise Exception(f"Failed to read text file: {str(e)}")
     
-    def extract_text_from_docx(self, docx_path):
-        """Extract text from DOCX files"""
+    def extract_text_from_docx(self, source):
+        """Extract text from a DOCX path or binary file object"""
         try:
-            doc = Document(docx_path)
-            text_content = []
-            
-            # Extract text from paragraphs
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_content.append(paragraph.text)
-            
-            # Extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            text_content.append(cell.text)
+            text_content = list(iter_docx_blocks(source))
             
             full_text = '\n'.join(text_content)
             logger.info(f"Successfully extracted text from DOCX: {len(full_text)} characters")
@@ -251,50 +567,28 @@ class TextProcessor:
             logger.error(f"Error reading DOCX file: {e}")
             raise Exception(f"Failed to read DOCX file: {str(e)}")
     
-    def extract_text_from_pptx(self, pptx_path):
-        """Extract text from PowerPoint files"""
+    def extract_text_from_pptx(self, source):
+        """Extract text from a PowerPoint path or binary file object"""
         try:
-            prs = Presentation(pptx_path)
             text_content = []
+            slide_count = 0
             
-            for slide_num, slide in enumerate(prs.slides, 1):
-                slide_text = f"\n--- Slide {slide_num} ---\n"
-                
-                # Extract text from all shapes in the slide
-                for shape in slide.shapes:
-                    if hasattr(shape, "text") and shape.text.strip():
-                        slide_text += shape.text + "\n"
-                    
-                    # Handle tables in slides
-                    if shape.has_table:
-                        table = shape.table
-                        for row in table.rows:
-                            row_text = []
-                            for cell in row.cells:
-                                if cell.text.strip():
-                                    row_text.append(cell.text.strip())
-                            if row_text:
-                                slide_text += " | ".join(row_text) + "\n"
-                    
-                    # Handle grouped shapes
-                    if hasattr(shape, 'shapes'):  # Group of shapes
-                        for sub_shape in shape.shapes:
-                            if hasattr(sub_shape, "text") and sub_shape.text.strip():
-                                slide_text += sub_shape.text + "\n"
-                
-                if slide_text.strip() != f"--- Slide {slide_num} ---":
-                    text_content.append(slide_text)
+            for slide_num, blocks in iter_pptx_slides(source):
+                slide_count += 1
+                if blocks:
+                    text_content.append(f"\n--- Slide {slide_num} ---\n" + '\n'.join(blocks) + '\n')
             
             full_text = '\n'.join(text_content)
-            logger.info(f"Successfully extracted text from PowerPoint: {len(full_text)} characters from {len(prs.slides)} slides")
+            logger.info(f"Successfully extracted text from PowerPoint: {len(full_text)} characters from {slide_count} slides")
             return full_text
             
         except Exception as e:
             logger.error(f"Error reading PowerPoint file: {e}")
             raise Exception(f"Failed to read PowerPoint file: {str(e)}")
     
-    def generate_text_report(self, summary, key_points, metadata=None, original_filename="Unknown"):
-        """Generate a text-based summary report"""
+    def generate_text_report(self, summary, key_points, metadata=None, original_filename="Unknown",
+                             generated_on=None):
+        """Generate a text-based summary report, dated generated_on (default: now)"""
         try:
             report_lines = []
             
@@ -317,7 +611,7 @@ class TextProcessor:
                 if 'detected_language' in metadata:
                     report_lines.append(f"Detected Language: {metadata.get('language_name', 'Unknown')}")
             
-            report_lines.append(f"Generated On: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            report_lines.append(f"Generated On: {(generated_on or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')}")
             report_lines.append("")
             
             # Summary
@@ -346,9 +640,32 @@ class TextProcessor:
             raise Exception(f"Text report generation failed: {str(e)}")
 
 # Utility functions
+_render_handler = None
+
+def render_pdf_report_bytes(fields):
+    """Process pool worker: render one PDF report, reusing a PDFHandler per process"""
+    global _render_handler
+    if _render_handler is None:
+        _render_handler = PDFHandler(extraction_workers=1)
+    return _render_handler.generate_summary_report(**fields)
+
+def report_fingerprint(kind, **fields):
+    """Stable hash of everything that determines a rendered report's content"""
+    payload = json.dumps(
+        [kind, REPORT_TEMPLATE_VERSION, fields], sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
 def clean_filename(filename):
     """Clean filename for safe usage"""
-    import re
     # Remove any dangerous characters
     filename = re.sub(r'[^\w\s-.]', '', filename)
-    return filename.strip()
\ No newline at end of file
+    return filename.strip()
+
+
+def truncate_words(text, max_words):
+    """Cut text after its max_words-th word, keeping the original whitespace"""
+    for count, match in enumerate(re.finditer(r'\S+', text), 1):
+        if count == max_words:
+            return text[:match.end()]
+    return text
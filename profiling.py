@@ -0,0 +1,188 @@
+"""
+Profiling Module for SmartNotes AI
+On-demand sampling CPU profiles and tracemalloc memory snapshots of the live process
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+import tracemalloc
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+MAX_PROFILE_SECONDS = 60
+MAX_SAMPLE_INTERVAL = 1.0
+
+
+class ProfilerBusy(Exception):
+    """Raised when a CPU profile is already running"""
+
+
+class SamplingProfiler:
+    """Periodically samples every thread's stack and counts collapsed stacks
+
+    The output is the "collapsed" format understood by flamegraph.pl and
+    speedscope: one line per unique stack, frames joined by ';', then a count.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def profile(self, seconds=10, interval=0.005):
+        """Sample all threads for the given duration and return collapsed stacks"""
+        seconds = max(0.1, min(float(seconds), MAX_PROFILE_SECONDS))
+        # Never sleep past the end of the profile
+        interval = max(0.001, min(float(interval), seconds, MAX_SAMPLE_INTERVAL))
+
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A CPU profile is already running")
+
+        try:
+            stacks = Counter()
+            own_ident = threading.get_ident()
+            deadline = time.monotonic() + seconds
+            samples = 0
+
+            while time.monotonic() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own_ident:
+                        continue
+                    stacks[self._collapse(names.get(ident, str(ident)), frame)] += 1
+                samples += 1
+                time.sleep(max(0.0, min(interval, deadline - time.monotonic())))
+
+            logger.info(f"CPU profile finished: {samples} samples over {seconds}s, {len(stacks)} unique stacks")
+            return '\n'.join(f"{stack} {count}" for stack, count in stacks.most_common()) + '\n'
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _collapse(thread_name, frame):
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            filename = os.path.basename(code.co_filename)
+            frames.append(f"{code.co_name}@{filename}:{frame.f_lineno}")
+            frame = frame.f_back
+        frames.append(thread_name.replace(';', '_').replace(' ', '_'))
+        return ';'.join(reversed(frames))
+
+
+class MemoryProfiler:
+    """tracemalloc snapshots with diffs against the previous snapshot"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._previous = None
+
+    def start(self, frames=10):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._previous = None
+            return self.status()
+
+    def stop(self):
+        with self._lock:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self._previous = None
+            return self.status()
+
+    def status(self):
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            'tracing': tracing,
+            'traced_current_bytes': current,
+            'traced_peak_bytes': peak
+        }
+
+    def snapshot(self, top=25, group_by='lineno', diff=False):
+        """Top allocation sites now, or growth since the previous snapshot"""
+        if group_by not in ('lineno', 'filename', 'traceback'):
+            group_by = 'lineno'
+
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError("tracemalloc is not running; start it first")
+
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            ))
+            previous, self._previous = self._previous, snapshot
+
+            if diff and previous is not None:
+                stats = snapshot.compare_to(previous, group_by)[:top]
+                entries = [{
+                    'location': self._location(stat.traceback),
+                    'size_bytes': stat.size,
+                    'size_diff_bytes': stat.size_diff,
+                    'count': stat.count,
+                    'count_diff': stat.count_diff
+                } for stat in stats]
+            else:
+                stats = snapshot.statistics(group_by)[:top]
+                entries = [{
+                    'location': self._location(stat.traceback),
+                    'size_bytes': stat.size,
+                    'count': stat.count
+                } for stat in stats]
+
+        result = self.status()
+        result.update({
+            'group_by': group_by,
+            'diff': bool(diff and previous is not None),
+            'top': entries,
+            'process': process_resources()
+        })
+        return result
+
+    @staticmethod
+    def _location(traceback):
+        return [f"{frame.filename}:{frame.lineno}" for frame in traceback]
+
+
+def process_resources():
+    """Open file descriptors and temp-dir usage, for spotting file/handle leaks"""
+    resources = {}
+
+    fd_dir = '/proc/self/fd'
+    if os.path.isdir(fd_dir):
+        try:
+            resources['open_fds'] = len(os.listdir(fd_dir))
+        except OSError:
+            pass
+
+    temp_dir = tempfile.gettempdir()
+    count = 0
+    total = 0
+    by_suffix = Counter()
+    try:
+        with os.scandir(temp_dir) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    count += 1
+                    size = entry.stat(follow_symlinks=False).st_size
+                    total += size
+                    by_suffix[os.path.splitext(entry.name)[1].lower() or '<none>'] += 1
+    except OSError:
+        pass
+
+    resources['temp_dir'] = {
+        'path': temp_dir,
+        'files': count,
+        'bytes': total,
+        'files_by_suffix': dict(by_suffix.most_common(10))
+    }
+    return resources
+
+
+cpu_profiler = SamplingProfiler()
+memory_profiler = MemoryProfiler()
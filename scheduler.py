@@ -0,0 +1,290 @@
+"""
+Inference Scheduler for SmartNotes AI
+Cost-aware admission control and fair-share ordering of summarization work
+"""
+
+import os
+import math
+import threading
+import time
+import logging
+import itertools
+import contextvars
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when the estimated queue wait for a request exceeds the limit"""
+
+    def __init__(self, estimated_wait, retry_after):
+        super().__init__(f"Server busy, estimated wait {estimated_wait:.0f}s")
+        self.estimated_wait = estimated_wait
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    """A unit of work waiting for (or running on) an inference worker"""
+
+    def __init__(self, seq, user_id, cost, call):
+        self.seq = seq
+        self.user_id = user_id
+        self.cost = cost
+        self.call = call
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+
+
+class InferenceScheduler:
+    """Order inference work shortest-first with per-user fair share and aging
+
+    Inference runs on a fixed pool of worker threads (one per slot), so the number
+    of concurrent generations never follows the number of request threads.
+    Each request is admitted with an estimated cost in tokens. When a worker frees
+    up the waiting ticket with the lowest score runs next:
+
+        score = (cost + recent usage of the user) / user weight - aging * seconds waited
+
+    so short requests go first, users who just consumed a lot of inference wait
+    behind light users, and long requests cannot starve forever. Requests are
+    rejected up front instead of queueing when the wait queue is full or their
+    estimated wait exceeds max_wait.
+    """
+
+    def __init__(self, slots=1, max_wait=30.0, max_queue_depth=None, aging_rate=50.0,
+                 usage_half_life=60.0, initial_throughput=200.0, default_weight=1.0):
+        self.slots = slots
+        self.max_wait = max_wait
+        self.max_queue_depth = max_queue_depth or slots * 8
+        self.aging_rate = aging_rate  # tokens of priority gained per second waited
+        self.usage_half_life = usage_half_life
+        self.default_weight = default_weight
+
+        # Observed tokens per second for a single slot (EWMA)
+        self.throughput = initial_throughput
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._seq = itertools.count()
+        self._waiting = []
+        self._running = {}
+        self._weights = {}
+        self._usage = {}  # user_id -> (decayed tokens, timestamp)
+        self._workers = []
+
+        # Telemetry
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+        self.rejected_overload = 0
+        self.rejected_queue_full = 0
+        self.completed = 0
+        self.tokens_completed = 0
+
+    # ==================== CONFIGURATION ====================
+
+    def set_user_weight(self, user_id, weight):
+        """Give a user a larger (or smaller) share of inference capacity"""
+        with self._lock:
+            self._weights[user_id] = max(weight, 0.01)
+
+    @staticmethod
+    def estimate_cost(text, tokenizer=None):
+        """Estimate the token count of a text before admitting it"""
+        if not text:
+            return 1
+        if tokenizer is not None:
+            try:
+                return max(1, len(tokenizer.encode(text, add_special_tokens=False)))
+            except Exception:
+                pass
+        # Roughly 4 tokens for every 3 English words with BPE tokenizers
+        return max(1, int(len(text.split()) * 4 / 3))
+
+    # ==================== SCHEDULING ====================
+
+    def submit(self, user_id, cost, fn, *args, reject=True, **kwargs):
+        """Queue fn(*args, **kwargs) to run on an inference worker; returns a Future
+
+        Raises AdmissionRejected straight away when the queue is full or the
+        estimated wait is too long. Background work should pass reject=False so
+        it always queues.
+        """
+        # Run in the submitter's context so tracing spans nest under its request;
+        # the call is attached before the ticket becomes visible to the workers
+        call = (contextvars.copy_context(), fn, args, kwargs)
+        return self._admit(user_id, cost, reject, call).future
+
+    def run(self, user_id, cost, fn, *args, reject=True, **kwargs):
+        """Run fn on an inference worker and block until it returns"""
+        return self.submit(user_id, cost, fn, *args, reject=reject, **kwargs).result()
+
+    def _admit(self, user_id, cost, reject, call):
+        with self._cond:
+            self._ensure_workers()
+            ticket = _Ticket(next(self._seq), user_id, cost, call)
+
+            if reject:
+                estimated_wait = self._estimate_wait(ticket)
+
+                if len(self._waiting) >= self.max_queue_depth:
+                    self.rejected_queue_full += 1
+                    logger.warning(f"Rejecting request from user {user_id}: inference queue full")
+                    raise AdmissionRejected(estimated_wait, max(1, math.ceil(estimated_wait)))
+
+                if estimated_wait > self.max_wait:
+                    self.rejected_overload += 1
+                    retry_after = max(1, math.ceil(estimated_wait - self.max_wait))
+                    logger.warning(
+                        f"Rejecting request from user {user_id}: cost {cost} tokens, "
+                        f"estimated wait {estimated_wait:.1f}s"
+                    )
+                    raise AdmissionRejected(estimated_wait, retry_after)
+
+            self._waiting.append(ticket)
+            self._cond.notify()
+            return ticket
+
+    def _ensure_workers(self):
+        """Start the fixed pool of inference threads on first use (lock held)"""
+        while len(self._workers) < self.slots:
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"inference-{len(self._workers)}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._waiting:
+                    self._cond.wait()
+                ticket = self._next_ticket()
+
+            if not ticket.future.set_running_or_notify_cancel():
+                self._finish(ticket)
+                continue
+
+            try:
+                context, fn, args, kwargs = ticket.call
+                ticket.future.set_result(context.run(fn, *args, **kwargs))
+            except BaseException as e:
+                ticket.future.set_exception(e)
+            finally:
+                self._finish(ticket)
+
+    def _next_ticket(self):
+        """Move the best-scoring waiting ticket to running (lock held)"""
+        now = time.monotonic()
+        ticket = min(self._waiting, key=lambda t: (self._score(t, now), t.seq))
+        self._waiting.remove(ticket)
+        self._running[ticket.seq] = ticket
+        ticket.started_at = now
+
+        wait = now - ticket.enqueued_at
+        self.wait_count += 1
+        self.wait_seconds_total += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        return ticket
+
+    def _finish(self, ticket):
+        with self._cond:
+            self._running.pop(ticket.seq, None)
+            elapsed = time.monotonic() - ticket.started_at
+            self.completed += 1
+            self.tokens_completed += ticket.cost
+            self._record_usage(ticket.user_id, ticket.cost)
+            if elapsed > 0:
+                observed = ticket.cost / elapsed
+                self.throughput = 0.8 * self.throughput + 0.2 * observed
+
+    def _score(self, ticket, now):
+        weight = self._weights.get(ticket.user_id, self.default_weight)
+        usage = self._current_usage(ticket.user_id, now)
+        waited = now - ticket.enqueued_at
+        return (ticket.cost + usage) / weight - self.aging_rate * waited
+
+    def _estimate_wait(self, ticket):
+        """Seconds until a new ticket would likely start running (lock held)"""
+        if len(self._running) < self.slots and not self._waiting:
+            return 0.0
+
+        now = time.monotonic()
+        ticket_score = self._score(ticket, now)
+        ahead = sum(t.cost for t in self._waiting if self._score(t, now) <= ticket_score)
+        # Assume running work is on average half done
+        in_flight = sum(t.cost for t in self._running.values()) / 2
+        return (ahead + in_flight) / (self.throughput * self.slots)
+
+    def _current_usage(self, user_id, now):
+        usage, stamp = self._usage.get(user_id, (0.0, now))
+        return usage * 0.5 ** ((now - stamp) / self.usage_half_life)
+
+    def _record_usage(self, user_id, cost):
+        now = time.monotonic()
+        self._usage[user_id] = (self._current_usage(user_id, now) + cost, now)
+
+    # ==================== TELEMETRY ====================
+
+    def stats(self):
+        """Snapshot of the scheduler state for health/metrics endpoints"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                'slots': self.slots,
+                'running': len(self._running),
+                'waiting': len(self._waiting),
+                'max_queue_depth': self.max_queue_depth,
+                'queued_tokens': sum(t.cost for t in self._waiting),
+                'oldest_wait_seconds': round(max((now - t.enqueued_at for t in self._waiting), default=0.0), 2),
+                'avg_wait_seconds': round(self.wait_seconds_total / self.wait_count, 3) if self.wait_count else 0.0,
+                'max_wait_seconds': round(self.max_wait_seconds, 3),
+                'rejected_overload': self.rejected_overload,
+                'rejected_queue_full': self.rejected_queue_full,
+                'completed': self.completed,
+                'tokens_completed': self.tokens_completed,
+                'throughput_tokens_per_second': round(self.throughput, 1)
+            }
+
+
+def physical_core_count():
+    """Number of physical CPU cores, falling back to logical cores"""
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return cores
+    except ImportError:
+        pass
+    return os.cpu_count() or 1
+
+
+def configure_inference_threads(slots=None, threads_per_slot=None):
+    """Split physical cores between inference slots and torch intra-op threads
+
+    Returns (slots, threads_per_slot) such that slots * threads_per_slot does not
+    exceed the physical core count, and applies the per-slot thread count to torch.
+    """
+    cores = physical_core_count()
+    if threads_per_slot is None:
+        threads_per_slot = max(1, cores // slots) if slots else min(4, cores)
+    if slots is None:
+        slots = max(1, cores // threads_per_slot)
+
+    try:
+        import torch
+        torch.set_num_threads(threads_per_slot)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Only allowed before any inter-op parallel work has started
+            pass
+    except ImportError:
+        pass
+
+    logger.info(f"Inference configured with {slots} slots x {threads_per_slot} torch threads ({cores} physical cores)")
+    return slots, threads_per_slot
@@ -6,7 +6,12 @@ from nltk.tokenize import sent_tokenize
 import warnings
 from langdetect import detect, DetectorFactory
 from googletrans import Translator
+from contextlib import contextmanager, nullcontext
+import threading
 import logging
+import time
+import os
+import tracing
 
 # Download required NLTK data
 try:
@@ -21,9 +26,119 @@ DetectorFactory.seed = 0
 
 logger = logging.getLogger(__name__)
 
-class NoteSummarizer:
+# Stage timing feeds the aggregated histograms on every request; set
+# SMARTNOTES_STAGE_TIMING=0 to skip it unless a request asks for a breakdown
+STAGE_TIMING_ENABLED = os.environ.get('SMARTNOTES_STAGE_TIMING', '1') != '0'
+
+_NO_TIMING = nullcontext()
+
+class StageHistograms:
+    """Aggregated wall-time histograms per summarization stage"""
+    
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+    
     def __init__(self):
-        """Initialize the summarizer with multilingual support"""
+        self._lock = threading.Lock()
+        self._stages = {}
+    
+    def observe(self, stage, seconds):
+        """Record one duration for a stage"""
+        index = len(self.BUCKETS)
+        for i, bound in enumerate(self.BUCKETS):
+            if seconds <= bound:
+                index = i
+                break
+        
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = {'counts': [0] * (len(self.BUCKETS) + 1), 'sum': 0.0, 'count': 0}
+            entry['counts'][index] += 1
+            entry['sum'] += seconds
+            entry['count'] += 1
+    
+    def snapshot(self):
+        """Copy of the per-stage bucket counts, sums and totals"""
+        with self._lock:
+            return {
+                stage: {'counts': list(entry['counts']), 'sum': entry['sum'], 'count': entry['count']}
+                for stage, entry in self._stages.items()
+            }
+
+stage_histograms = StageHistograms()
+
+class StageTimings:
+    """Per-request breakdown of wall and CPU time spent in each summarization stage"""
+    
+    def __init__(self, histograms=None):
+        self.histograms = histograms
+        self.stages = {}
+        self.counts = {}
+        self.started = time.perf_counter()
+    
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one call of the named stage"""
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            entry = self.stages.get(name)
+            if entry is None:
+                entry = self.stages[name] = {'wall_ms': 0.0, 'cpu_ms': 0.0, 'calls': 0}
+            entry['wall_ms'] += wall * 1000
+            entry['cpu_ms'] += cpu * 1000
+            entry['calls'] += 1
+            if self.histograms is not None:
+                self.histograms.observe(name, wall)
+    
+    def count(self, name, value=1):
+        """Add to a counter such as tokens or chunks"""
+        self.counts[name] = self.counts.get(name, 0) + value
+    
+    def set(self, name, value):
+        """Record a descriptive value such as the model id"""
+        self.counts[name] = value
+    
+    def to_dict(self):
+        """Breakdown suitable for a JSON response"""
+        return {
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 2),
+            'stages': {
+                name: {
+                    'wall_ms': round(entry['wall_ms'], 2),
+                    'cpu_ms': round(entry['cpu_ms'], 2),
+                    'calls': entry['calls']
+                }
+                for name, entry in self.stages.items()
+            },
+            **self.counts
+        }
+
+@contextmanager
+def _traced_stage(timings, name, attributes):
+    with tracing.span(f'summarizer.{name}', **attributes):
+        with timings.stage(name) if timings is not None else _NO_TIMING:
+            yield
+
+def _stage(timings, name, **attributes):
+    """Context manager timing a stage (and tracing it in sampled requests),
+    or a shared no-op when both are off"""
+    if tracing.is_recording():
+        return _traced_stage(timings, name, attributes)
+    return timings.stage(name) if timings is not None else _NO_TIMING
+
+class NoteSummarizer:
+    def __init__(self, load_models=True):
+        """Initialize the summarizer with multilingual support
+        
+        With load_models=False no models are loaded; the caller must set
+        english_summarizer/english_tokenizer (and the multilingual pair) itself,
+        e.g. with stand-ins for benchmarking.
+        """
         self.translator = Translator()
         self.supported_languages = {
             'te': 'Telugu' ,
@@ -46,10 +161,25 @@ class NoteSummarizer:
             'fi': 'Finnish'
         }
         
+        # Maximum number of chunks sent to the model in a single call
+        self.generation_batch_size = 8
+        
+        # Seconds spent loading each model, for the metrics endpoint
+        self.model_load_seconds = {}
+        
+        if not load_models:
+            self.device = -1
+            return
+        
         try:
             # Initialize multilingual models
+            load_start = time.perf_counter()
             self._init_english_model()
+            self.model_load_seconds['english'] = time.perf_counter() - load_start
+            
+            load_start = time.perf_counter()
             self._init_multilingual_model()
+            self.model_load_seconds['multilingual'] = time.perf_counter() - load_start
             
             print(f"Models loaded successfully on {'GPU' if self.device == 0 else 'CPU'}")
             
@@ -75,6 +205,7 @@ class NoteSummarizer:
             )
             
             self.english_tokenizer = AutoTokenizer.from_pretrained(model_name)
+            self.english_model_name = model_name
             
         except Exception as e:
             print(f"Error loading English model: {e}")
@@ -87,6 +218,7 @@ class NoteSummarizer:
                     device=self.device
                 )
                 self.english_tokenizer = AutoTokenizer.from_pretrained(model_name)
+                self.english_model_name = model_name
                 print("English fallback model loaded successfully")
             except Exception as fallback_error:
                 print(f"English fallback model also failed: {fallback_error}")
@@ -193,13 +325,15 @@ class NoteSummarizer:
         
         return ' '.join(meaningful_sentences)
     
-    def chunk_text(self, text, max_chunk_length=1000, tokenizer=None):
+    def chunk_text(self, text, max_chunk_length=1000, tokenizer=None, timings=None):
         """Split text into chunks that fit within model limits"""
         if tokenizer is None:
             tokenizer = self.english_tokenizer
             
         # Get token count
         tokens = tokenizer.encode(text)
+        if timings is not None:
+            timings.count('input_tokens', len(tokens))
         
         if len(tokens) <= max_chunk_length:
             return [text]
@@ -226,7 +360,8 @@ class NoteSummarizer:
         
         return chunks
     
-    def summarize_text(self, text, max_length=150, min_length=50, summary_type="balanced", target_language=None):
+    def summarize_text(self, text, max_length=150, min_length=50, summary_type="balanced", target_language=None,
+                       progress_callback=None, timings=None):
         """
         Summarize the input text with multilingual support
         
@@ -236,13 +371,135 @@ class NoteSummarizer:
             min_length (int): Minimum length of summary
             summary_type (str): Type of summary - "brief", "balanced", or "detailed"
             target_language (str): Target language for summary (None for auto-detect)
+            progress_callback (callable): Optional, called with the completed
+                fraction (0.0 - 1.0) as chunks are summarized
+            timings (StageTimings): Optional, receives the per-stage breakdown
         
         Returns:
             dict: Contains summary text and metadata
         """
+        if timings is None and STAGE_TIMING_ENABLED:
+            timings = StageTimings(stage_histograms)
+        elif timings is not None and timings.histograms is None:
+            timings.histograms = stage_histograms
+        
         try:
-            if not text or len(text.strip()) < 50:
-                return {
+            plan = self._prepare_document(text, max_length, min_length, summary_type, target_language, timings)
+            if plan.get('result'):
+                return plan['result']
+            
+            chunks = plan['chunks']
+            summaries = []
+            for start in range(0, len(chunks), self.generation_batch_size):
+                batch = chunks[start:start + self.generation_batch_size]
+                with _stage(timings, 'generate', chunk_start=start, chunks=len(batch)):
+                    summaries.extend(self._generate_summaries(
+                        plan['summarizer'],
+                        batch,
+                        plan['max_length'],
+                        plan['min_length']
+                    ))
+                if progress_callback:
+                    # Leave headroom for the combine/translate pass
+                    progress_callback(0.9 * len(summaries) / len(chunks))
+            
+            result = self._finalize_document(plan, summaries, timings)
+            if progress_callback:
+                progress_callback(1.0)
+            return result
+            
+        except Exception as e:
+            print(f"Error in summarization: {e}")
+            return self._error_result(text, e)
+    
+    def summarize_batch(self, documents, batch_size=None):
+        """
+        Summarize many documents in one scheduling pass
+        
+        Chunks from all documents are queued together and sent to the model in
+        shared batches, so a call with many short documents costs a handful of
+        pipeline invocations instead of one per document.
+        
+        Args:
+            documents (list): Dicts with 'text' and optional 'max_length',
+                'min_length', 'summary_type' and 'target_language' keys
+            batch_size (int): Maximum number of chunks per model call
+                (defaults to generation_batch_size)
+        
+        Yields:
+            tuple: (index, result) as each document finishes, where result has
+                the same shape as summarize_text()
+        """
+        batch_size = batch_size or self.generation_batch_size
+        plans = {}
+        pending_chunks = {}
+        queue = []
+        
+        for index, doc in enumerate(documents):
+            text = doc.get('text', '')
+            timings = StageTimings(stage_histograms) if STAGE_TIMING_ENABLED else None
+            try:
+                plan = self._prepare_document(
+                    text,
+                    doc.get('max_length', 150),
+                    doc.get('min_length', 50),
+                    doc.get('summary_type', 'balanced'),
+                    doc.get('target_language'),
+                    timings
+                )
+            except Exception as e:
+                logger.error(f"Error preparing batch item {index}: {e}")
+                yield index, self._error_result(text, e)
+                continue
+            
+            if plan.get('result'):
+                yield index, plan['result']
+                continue
+            
+            plans[index] = plan
+            plan['timings'] = timings
+            plan['summaries'] = [None] * len(plan['chunks'])
+            pending_chunks[index] = len(plan['chunks'])
+            for position, chunk in enumerate(plan['chunks']):
+                queue.append((index, position, chunk))
+        
+        for start in range(0, len(queue), batch_size):
+            batch = queue[start:start + batch_size]
+            
+            # One model call per distinct set of generation settings in the batch
+            groups = {}
+            for index, position, chunk in batch:
+                plan = plans[index]
+                key = (id(plan['summarizer']), plan['max_length'], plan['min_length'])
+                groups.setdefault(key, []).append((index, position, chunk))
+            
+            for items in groups.values():
+                plan = plans[items[0][0]]
+                outputs = self._generate_summaries(
+                    plan['summarizer'],
+                    [chunk for _, _, chunk in items],
+                    plan['max_length'],
+                    plan['min_length']
+                )
+                for (index, position, _), output in zip(items, outputs):
+                    plans[index]['summaries'][position] = output
+                    pending_chunks[index] -= 1
+            
+            finished = sorted({index for index, _, _ in batch if pending_chunks[index] == 0})
+            for index in finished:
+                plan = plans.pop(index)
+                del pending_chunks[index]
+                try:
+                    yield index, self._finalize_document(plan, plan['summaries'], plan['timings'])
+                except Exception as e:
+                    logger.error(f"Error finalizing batch item {index}: {e}")
+                    yield index, self._error_result(plan['text'], e)
+    
+    def _prepare_document(self, text, max_length, min_length, summary_type, target_language, timings=None):
+        """Detect language, translate and chunk a document ahead of generation"""
+        if not text or len(text.strip()) < 50:
+            return {
+                'result': {
                     "summary": "Text too short to summarize effectively.",
                     "original_length": len(text.split()),
                     "summary_length": 0,
@@ -250,74 +507,123 @@ class NoteSummarizer:
                     "detected_language": "en",
                     "language_name": "English"
                 }
-            
-            # Detect language
+            }
+        
+        # Detect language
+        with _stage(timings, 'detect_language'):
             detected_lang = self.detect_language(text)
-            lang_name = self.supported_languages.get(detected_lang, "Unknown")
-            
-            # Use target language if specified, otherwise use detected language
-            if target_language and target_language in self.supported_languages:
-                summary_lang = target_language
-            else:
-                summary_lang = detected_lang
-            
-            # Adjust parameters based on summary type
-            if summary_type == "brief":
-                max_length = min(max_length, 100)
-                min_length = min(min_length, 30)
-            elif summary_type == "detailed":
-                max_length = min(max_length * 2, 300)
-                min_length = min(min_length * 1.5, 100)
-            
-            # Preprocess the text
+        lang_name = self.supported_languages.get(detected_lang, "Unknown")
+        
+        # Use target language if specified, otherwise use detected language
+        if target_language and target_language in self.supported_languages:
+            summary_lang = target_language
+        else:
+            summary_lang = detected_lang
+        
+        # Adjust parameters based on summary type
+        if summary_type == "brief":
+            max_length = min(max_length, 100)
+            min_length = min(min_length, 30)
+        elif summary_type == "detailed":
+            max_length = min(max_length * 2, 300)
+            min_length = min(min_length * 1.5, 100)
+        
+        # Preprocess the text
+        with _stage(timings, 'preprocess'):
             processed_text = self.preprocess_text(text)
-            
-            # Choose appropriate model and tokenizer
-            if detected_lang == 'en':
-                summarizer = self.english_summarizer
-                tokenizer = self.english_tokenizer
-                working_text = processed_text
-            else:
-                # For non-English text, translate to English for better summarization
+        
+        # Choose appropriate model and tokenizer
+        if detected_lang == 'en':
+            summarizer = self.english_summarizer
+            tokenizer = self.english_tokenizer
+            working_text = processed_text
+        else:
+            # For non-English text, translate to English for better summarization
+            with _stage(timings, 'translate_input'):
                 working_text = self.translate_text(processed_text, target_lang='en', source_lang=detected_lang)
-                summarizer = self.english_summarizer
-                tokenizer = self.english_tokenizer
-            
-            # Split into chunks if necessary
-            chunks = self.chunk_text(working_text, tokenizer=tokenizer)
-            
-            summaries = []
-            for chunk in chunks:
+            summarizer = self.english_summarizer
+            tokenizer = self.english_tokenizer
+        
+        # Split into chunks if necessary
+        with _stage(timings, 'chunk'):
+            chunks = self.chunk_text(working_text, tokenizer=tokenizer, timings=timings)
+        
+        if timings is not None:
+            timings.count('chunks', len(chunks))
+            timings.set('model', getattr(self, 'english_model_name', 'unknown'))
+            timings.set('detected_language', detected_lang)
+        
+        return {
+            'text': text,
+            'detected_lang': detected_lang,
+            'lang_name': lang_name,
+            'summary_lang': summary_lang,
+            'max_length': max_length,
+            'min_length': min_length,
+            'summarizer': summarizer,
+            'chunks': chunks
+        }
+    
+    def _generate_summaries(self, summarizer, chunks, max_length, min_length):
+        """Run the model over a list of chunks, falling back per chunk on failure"""
+        try:
+            results = summarizer(
+                chunks,
+                max_length=max_length,
+                min_length=min_length,
+                do_sample=False,
+                truncation=True,
+                batch_size=min(len(chunks), self.generation_batch_size)
+            )
+            return [result['summary_text'] for result in results]
+        except Exception as batch_error:
+            if len(chunks) > 1:
+                logger.warning(f"Batched generation failed, retrying chunks individually: {batch_error}")
+        
+        summaries = []
+        for chunk in chunks:
+            try:
+                result = summarizer(
+                    chunk,
+                    max_length=max_length,
+                    min_length=min_length,
+                    do_sample=False,
+                    truncation=True
+                )
+                summaries.append(result[0]['summary_text'])
+            except Exception as chunk_error:
+                print(f"Error summarizing chunk: {chunk_error}")
+                # If individual chunk fails, try with more conservative settings
                 try:
                     result = summarizer(
                         chunk,
-                        max_length=max_length,
-                        min_length=min_length,
+                        max_length=min(max_length, 100),
+                        min_length=min(min_length, 20),
                         do_sample=False,
                         truncation=True
                     )
                     summaries.append(result[0]['summary_text'])
-                except Exception as chunk_error:
-                    print(f"Error summarizing chunk: {chunk_error}")
-                    # If individual chunk fails, try with more conservative settings
-                    try:
-                        result = summarizer(
-                            chunk,
-                            max_length=min(max_length, 100),
-                            min_length=min(min_length, 20),
-                            do_sample=False,
-                            truncation=True
-                        )
-                        summaries.append(result[0]['summary_text'])
-                    except:
-                        summaries.append("Could not summarize this section.")
-            
-            # Combine summaries if multiple chunks
-            if len(summaries) > 1:
-                combined_summary = ' '.join(summaries)
-                # If combined summary is too long, summarize it again
-                if len(combined_summary.split()) > max_length * 1.5:
-                    try:
+                except:
+                    summaries.append("Could not summarize this section.")
+        
+        return summaries
+    
+    def _finalize_document(self, plan, summaries, timings=None):
+        """Combine chunk summaries, translate back and compute metrics"""
+        text = plan['text']
+        summarizer = plan['summarizer']
+        max_length = plan['max_length']
+        min_length = plan['min_length']
+        detected_lang = plan['detected_lang']
+        summary_lang = plan['summary_lang']
+        
+        # Combine summaries if multiple chunks
+        if len(summaries) > 1:
+            combined_summary = ' '.join(summaries)
+            # If combined summary is too long, summarize it again
+            if len(combined_summary.split()) > max_length * 1.5:
+                try:
+                    with _stage(timings, 'resummarize'):
                         final_result = summarizer(
                             combined_summary,
                             max_length=max_length,
@@ -325,46 +631,51 @@ class NoteSummarizer:
                             do_sample=False,
                             truncation=True
                         )
-                        final_summary = final_result[0]['summary_text']
-                    except:
-                        final_summary = combined_summary[:max_length * 6]  # Rough character limit
-                else:
-                    final_summary = combined_summary
+                    final_summary = final_result[0]['summary_text']
+                except:
+                    final_summary = combined_summary[:max_length * 6]  # Rough character limit
             else:
-                final_summary = summaries[0] if summaries else "Could not generate summary."
-            
-            # Translate summary back to target language if needed
-            if summary_lang != 'en' and summary_lang != detected_lang:
+                final_summary = combined_summary
+        else:
+            final_summary = summaries[0] if summaries else "Could not generate summary."
+        
+        # Translate summary back to target language if needed
+        if summary_lang != 'en' and summary_lang != detected_lang:
+            with _stage(timings, 'translate_output'):
                 final_summary = self.translate_text(final_summary, target_lang=summary_lang, source_lang='en')
-            elif summary_lang != 'en' and detected_lang != 'en':
+        elif summary_lang != 'en' and detected_lang != 'en':
+            with _stage(timings, 'translate_output'):
                 final_summary = self.translate_text(final_summary, target_lang=summary_lang, source_lang='en')
-            
-            # Calculate metrics
-            original_word_count = len(text.split())
-            summary_word_count = len(final_summary.split())
-            compression_ratio = (original_word_count - summary_word_count) / original_word_count if original_word_count > 0 else 0
-            
-            return {
-                "summary": final_summary,
-                "original_length": original_word_count,
-                "summary_length": summary_word_count,
-                "compression_ratio": round(compression_ratio * 100, 1),
-                "detected_language": detected_lang,
-                "language_name": lang_name,
-                "target_language": summary_lang,
-                "target_language_name": self.supported_languages.get(summary_lang, "Unknown")
-            }
-            
-        except Exception as e:
-            print(f"Error in summarization: {e}")
-            return {
-                "summary": f"Error generating summary: {str(e)}",
-                "original_length": len(text.split()) if text else 0,
-                "summary_length": 0,
-                "compression_ratio": 0,
-                "detected_language": "en",
-                "language_name": "English"
-            }
+        
+        # Calculate metrics
+        original_word_count = len(text.split())
+        summary_word_count = len(final_summary.split())
+        
+        if timings is not None:
+            timings.count('summary_words', summary_word_count)
+        compression_ratio = (original_word_count - summary_word_count) / original_word_count if original_word_count > 0 else 0
+        
+        return {
+            "summary": final_summary,
+            "original_length": original_word_count,
+            "summary_length": summary_word_count,
+            "compression_ratio": round(compression_ratio * 100, 1),
+            "detected_language": detected_lang,
+            "language_name": plan['lang_name'],
+            "target_language": summary_lang,
+            "target_language_name": self.supported_languages.get(summary_lang, "Unknown")
+        }
+    
+    def _error_result(self, text, error):
+        """Build the result returned when summarization fails"""
+        return {
+            "summary": f"Error generating summary: {str(error)}",
+            "original_length": len(text.split()) if text else 0,
+            "summary_length": 0,
+            "compression_ratio": 0,
+            "detected_language": "en",
+            "language_name": "English"
+        }
     
     def extract_key_points(self, text, num_points=5, target_language=None):
         """Extract key points from the text with language support"""
@@ -399,7 +710,4 @@ class NoteSummarizer:
     
     def get_supported_languages(self):
         """Return list of supported languages"""
-        return self.supported_languages
-
-# Create a global instance (optional, for easier importing)
-note_summarizer = NoteSummarizer()
\ No newline at end of file
+        return self.supported_languages
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+Per-page quality heuristic that decides when PyPDF2 text is escalated to pdfplumber
+"""
+
+import pytest
+
+pytest.importorskip('PyPDF2')
+pytest.importorskip('pdfplumber')
+pytest.importorskip('reportlab')
+
+from pdf_handler import _page_text_is_poor
+
+
+@pytest.mark.parametrize('text', [
+    'The quick brown fox jumps over the lazy dog, then naps in the afternoon sun. ' * 3,
+    '自然语言处理是人工智能的一个重要分支，研究计算机与人类语言之间的交互。' * 3,
+    '日本語の文章は単語の間にスペースを入れずに書かれます。これは普通のページです。' * 3,
+    'ภาษาไทยเป็นภาษาที่ไม่มีการเว้นวรรคระหว่างคำในประโยคเดียวกัน' * 3,
+    '第1章 AI 2 3 自然语言处理是人工智能的一个重要分支' * 2,
+])
+def test_good_pages_stay_on_fast_path(text):
+    assert not _page_text_is_poor(text)
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    'Page 3',
+    'T h e q u i c k b r o w n f o x j u m p s ' * 3,
+    'Thequickbrownfoxjumpsoverthelazydogandkeepsrunning' * 3,
+    '(cid:12)(cid:34)(cid:56) some words (cid:78)(cid:90) ' * 3,
+])
+def test_poor_pages_are_escalated(text):
+    assert _page_text_is_poor(text)
@@ -0,0 +1,139 @@
+"""
+WebsiteProcessor fetch behaviour against the local stub web server:
+retries, backoff, timeouts and connection reuse
+"""
+
+import socket
+import time
+
+import pytest
+
+requests = pytest.importorskip('requests')
+pytest.importorskip('bs4')
+
+import metrics
+import url_processor
+from benchmarks.fixtures import StubWebServer, render_article
+from url_processor import WebsiteProcessor
+
+
+def counter_value(counter, *labels):
+    return counter.labels(*labels).value()
+
+
+@pytest.fixture
+def processor():
+    processor = WebsiteProcessor(connect_timeout=1, read_timeout=1, max_retries=2, backoff_factor=0.01)
+    yield processor
+    processor.close()
+
+
+def test_retries_503_then_succeeds(processor):
+    page = render_article(1)
+    pages = {'/flaky': [(503, {}, b'busy'), (503, {}, b'busy'), (200, {}, page)]}
+    retries_before = counter_value(metrics.HTTP_CLIENT_RETRIES, 'status')
+
+    with StubWebServer(pages=pages) as web:
+        response, body = processor.fetch(web.base_url + '/flaky')
+
+    assert response.status_code == 200
+    assert body == page
+    assert counter_value(metrics.HTTP_CLIENT_RETRIES, 'status') - retries_before == 2
+
+
+def test_exhausted_status_retries_return_last_response(processor):
+    pages = {'/down': [(503, {}, b'busy')]}
+    retries_before = counter_value(metrics.HTTP_CLIENT_RETRIES, 'status')
+
+    with StubWebServer(pages=pages) as web:
+        response, body = processor.fetch(web.base_url + '/down')
+
+    assert response.status_code == 503
+    assert body == b''
+    # Two retries after the first attempt; the final give-up is not a retry
+    assert counter_value(metrics.HTTP_CLIENT_RETRIES, 'status') - retries_before == 2
+
+
+def test_retry_after_is_capped(processor, monkeypatch):
+    monkeypatch.setattr(url_processor, 'RETRY_BACKOFF_MAX', 0.2)
+    pages = {'/later': [(503, {'Retry-After': '3600'}, b'busy'), (200, {}, render_article(2))]}
+
+    with StubWebServer(pages=pages) as web:
+        start = time.monotonic()
+        response, _ = processor.fetch(web.base_url + '/later')
+        elapsed = time.monotonic() - start
+
+    assert response.status_code == 200
+    assert elapsed < 5
+
+
+def test_connect_failure_retries_then_raises(processor):
+    # Bind and release a port so nothing is listening on it
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    retries_before = counter_value(metrics.HTTP_CLIENT_RETRIES, 'connect')
+    errors_before = counter_value(metrics.HTTP_CLIENT_REQUESTS, 'error')
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        processor.fetch(f"http://127.0.0.1:{port}/")
+
+    assert counter_value(metrics.HTTP_CLIENT_RETRIES, 'connect') - retries_before == 2
+    assert counter_value(metrics.HTTP_CLIENT_REQUESTS, 'error') - errors_before == 1
+
+
+def test_read_timeout_is_retried_then_raised(processor):
+    pages = {'/slow': [(200, {}, render_article(3), 3)]}
+    retries_before = counter_value(metrics.HTTP_CLIENT_RETRIES, 'read')
+    timeouts_before = counter_value(metrics.HTTP_CLIENT_REQUESTS, 'read_timeout')
+
+    with StubWebServer(pages=pages) as web:
+        start = time.monotonic()
+        with pytest.raises(requests.exceptions.ConnectionError):
+            processor.fetch(web.base_url + '/slow')
+        elapsed = time.monotonic() - start
+
+    assert counter_value(metrics.HTTP_CLIENT_RETRIES, 'read') - retries_before == 2
+    assert counter_value(metrics.HTTP_CLIENT_REQUESTS, 'read_timeout') - timeouts_before == 1
+    # Three attempts of about one read timeout each, not three full server delays
+    assert elapsed < 6
+
+
+def test_keep_alive_connection_is_reused(processor):
+    connections_before = counter_value(metrics.HTTP_CLIENT_CONNECTIONS, 'http')
+
+    with StubWebServer(articles=5) as web:
+        for url in web.urls():
+            response, body = processor.fetch(url)
+            assert response.status_code == 200 and body
+
+    assert counter_value(metrics.HTTP_CLIENT_CONNECTIONS, 'http') - connections_before == 1
+
+
+def test_redirect_is_followed_without_reading_its_body(processor):
+    page = render_article(4)
+    pages = {
+        '/old': [(301, {'Location': '/moved'}, b'x' * (64 * 1024))],
+        '/moved': [(302, {'Location': '/new'}, b'')],
+        '/new': [(200, {}, page)],
+    }
+    redirects_before = counter_value(metrics.HTTP_CLIENT_REQUESTS, '3xx')
+
+    with StubWebServer(pages=pages) as web:
+        response, body = processor.fetch(web.base_url + '/old')
+
+    assert response.status_code == 200
+    assert body == page
+    assert counter_value(metrics.HTTP_CLIENT_REQUESTS, '3xx') - redirects_before == 2
+
+
+def test_redirect_loop_is_refused(processor):
+    pages = {'/loop': [(302, {'Location': '/loop'}, b'')]}
+    aborts_before = counter_value(metrics.HTTP_CLIENT_ABORTS, 'redirect')
+
+    with StubWebServer(pages=pages) as web:
+        with pytest.raises(url_processor.FetchError) as excinfo:
+            processor.fetch(web.base_url + '/loop')
+
+    assert excinfo.value.reason == 'redirect'
+    assert counter_value(metrics.HTTP_CLIENT_ABORTS, 'redirect') - aborts_before == 1
@@ -0,0 +1,212 @@
+"""
+Request Tracing Module for SmartNotes AI
+Records nested timing spans per request and writes them as OpenTelemetry (OTLP/JSON) lines
+"""
+
+import os
+import json
+import time
+import random
+import secrets
+import threading
+import logging
+import contextvars
+from contextlib import contextmanager, nullcontext
+from logging.handlers import RotatingFileHandler
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'smartnotes-ai'
+
+_current_span = contextvars.ContextVar('smartnotes_current_span', default=None)
+
+
+def _attribute(key, value):
+    """Encode one attribute as an OTLP AnyValue key/value pair"""
+    if isinstance(value, bool):
+        encoded = {'boolValue': value}
+    elif isinstance(value, int):
+        encoded = {'intValue': str(value)}
+    elif isinstance(value, float):
+        encoded = {'doubleValue': value}
+    else:
+        encoded = {'stringValue': str(value)}
+    return {'key': key, 'value': encoded}
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    def __init__(self, trace, name, parent=None, attributes=None):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_error(self, error):
+        self.error = str(error)
+
+    def end(self):
+        self.end_ns = time.time_ns()
+        self.trace.finish_span(self)
+
+    def to_otlp(self):
+        span = {
+            'traceId': self.trace.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,  # SPAN_KIND_INTERNAL
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [_attribute(k, v) for k, v in self.attributes.items() if v is not None],
+            'status': {'code': 2, 'message': self.error} if self.error else {'code': 0}
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+class Trace:
+    """All spans of one sampled request, flushed when the root span ends"""
+
+    def __init__(self, tracer, request_id):
+        self.tracer = tracer
+        self.request_id = request_id
+        self.trace_id = secrets.token_hex(16)
+        self.root = None
+        self._finished = []
+        self._lock = threading.Lock()
+
+    def finish_span(self, span):
+        with self._lock:
+            self._finished.append(span)
+            if span is not self.root and self.root.end_ns is None:
+                return
+            spans, self._finished = self._finished, []
+        # Spans ending after the root (e.g. streamed responses) are flushed on their own
+        self.tracer.export(spans)
+
+
+class Tracer:
+    """Creates traces for sampled requests and exports them to a rotating file"""
+
+    def __init__(self):
+        self.sample_rate = 0.0
+        self._file_logger = None
+
+    def configure(self, path='traces.jsonl', sample_rate=0.1, max_bytes=50 * 1024 * 1024, backup_count=5):
+        """Enable tracing to a rotating file; sample_rate is the fraction of requests kept"""
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+
+        if self.sample_rate > 0 and self._file_logger is None:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+
+            file_logger = logging.getLogger('smartnotes.traces')
+            file_logger.setLevel(logging.INFO)
+            file_logger.propagate = False
+            file_logger.addHandler(handler)
+            self._file_logger = file_logger
+
+        logger.info(f"Tracing {'enabled' if self.sample_rate > 0 else 'disabled'} (sample rate {self.sample_rate})")
+
+    def start_trace(self, name, request_id=None, **attributes):
+        """Start a root span if this request is sampled
+
+        Returns (span, token) to pass to end_trace(), or (None, None) when the
+        request is not sampled.
+        """
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None, None
+
+        trace = Trace(self, request_id or secrets.token_hex(8))
+        span = Span(trace, name, attributes=dict(attributes, **{'request.id': trace.request_id}))
+        trace.root = span
+        token = _current_span.set(span)
+        return span, token
+
+    def end_trace(self, span, token, error=None):
+        if span is None:
+            return
+        if error is not None:
+            span.record_error(error)
+        span.end()
+        _current_span.reset(token)
+
+    def export(self, spans):
+        if self._file_logger is None or not spans:
+            return
+        record = {
+            'resourceSpans': [{
+                'resource': {'attributes': [_attribute('service.name', SERVICE_NAME)]},
+                'scopeSpans': [{
+                    'scope': {'name': 'smartnotes.tracing'},
+                    'spans': [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+        try:
+            self._file_logger.info(json.dumps(record, separators=(',', ':')))
+        except Exception as e:
+            logger.warning(f"Failed to write trace: {e}")
+
+
+tracer = Tracer()
+
+
+def is_recording():
+    """True when the current context belongs to a sampled trace"""
+    return _current_span.get() is not None
+
+
+def current_request_id():
+    span = _current_span.get()
+    return span.trace.request_id if span else None
+
+
+@contextmanager
+def _recording_span(parent, name, attributes):
+    span = Span(parent.trace, name, parent=parent, attributes=attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def record_error(self, error):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_NOOP_SPAN_CONTEXT = nullcontext(_NOOP_SPAN)
+
+
+def span(name, **attributes):
+    """Context manager for a child span of the current span
+
+    Outside a sampled trace this returns a shared no-op context, so call sites
+    can stay instrumented permanently.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return _NOOP_SPAN_CONTEXT
+    return _recording_span(parent, name, attributes)
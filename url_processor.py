@@ -4,9 +4,23 @@ Handles website content extraction
 """
 
 import re
+import time
+import zlib
+import socket
+import http.client
+import hashlib
 import logging
+from urllib.parse import urljoin
+from email.utils import parsedate_to_datetime
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import MaxRetryError, ConnectTimeoutError, NewConnectionError, ReadTimeoutError
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+import tracing
+import metrics
+from cache import DiskCache
+from html_extraction import get_extractor
 
 logger = logging.getLogger(__name__)
 
@@ -23,79 +37,505 @@ def validate_url(url):
     return url_pattern.match(url) is not None
 
 
+# Bump whenever extraction output changes; cached pages are then re-parsed from their stored body
+URL_EXTRACTOR_VERSION = 1
+
+# Heuristic freshness for responses with Last-Modified but no explicit lifetime (RFC 9111 4.2.2)
+HEURISTIC_FRESHNESS_FRACTION = 0.1
+HEURISTIC_FRESHNESS_MAX = 24 * 3600
+
+# Longest sleep between retries, whatever the backoff factor
+RETRY_BACKOFF_MAX = 10
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Body download limits
+MAX_REDIRECTS = 5
+FETCH_CHUNK_SIZE = 64 * 1024
+SNIFF_BYTES = 512
+MAX_DECOMPRESSION_RATIO = 100
+DECOMPRESSION_RATIO_FLOOR = 1024 * 1024  # small bodies may compress arbitrarily well
+
+HTML_CONTENT_TYPES = frozenset(['text/html', 'application/xhtml+xml'])
+# Types servers send when they do not know better; the body decides
+SNIFFED_CONTENT_TYPES = frozenset(['', 'text/plain', 'application/octet-stream', 'application/unknown', 'unknown/unknown'])
+# WHATWG MIME sniffing patterns for text/html
+HTML_SIGNATURE = re.compile(
+    rb'^\s*(?:<!--|<(?:!doctype html|html|head|script|iframe|h1|div|font|table|a|style|title|b|body|br|p)[\s>])',
+    re.IGNORECASE
+)
+
+
+class FetchError(Exception):
+    """A download refused or abandoned; status is the HTTP status to report to the client"""
+
+    def __init__(self, message, status=400, reason='error'):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+
+
+def _decoder(content_encoding):
+    """zlib decompressor for a Content-Encoding, or None for identity"""
+    encoding = (content_encoding or '').strip().lower()
+    if encoding in ('', 'identity'):
+        return None
+    if encoding in ('gzip', 'x-gzip'):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        # Accepts zlib-wrapped deflate; raw deflate is retried in _BodyReader
+        return zlib.decompressobj()
+    raise FetchError(f"Unsupported content encoding: {content_encoding}", status=415, reason='encoding')
+
+
+def _failure_outcome(error):
+    """Metric label for a request that got no response
+    
+    Once retries are exhausted, urllib3 raises MaxRetryError and requests wraps it
+    in a plain ConnectionError, so the timeout that caused it is found on .reason.
+    """
+    cause = error.args[0] if error.args else None
+    if isinstance(cause, MaxRetryError):
+        cause = cause.reason
+    # NewConnectionError (refused, unreachable) subclasses ConnectTimeoutError
+    if isinstance(cause, NewConnectionError):
+        return 'error'
+    if isinstance(cause, ConnectTimeoutError) or isinstance(error, requests.exceptions.ConnectTimeout):
+        return 'connect_timeout'
+    if isinstance(cause, ReadTimeoutError) or isinstance(error, requests.exceptions.ReadTimeout):
+        return 'read_timeout'
+    return 'error'
+
+
+class _CountingRetry(Retry):
+    """Retry policy that records each retry in metrics and caps the backoff"""
+    
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if response is not None and error is None:
+            reason = 'status'
+        elif error is not None and self._is_connection_error(error):
+            reason = 'connect'
+        elif error is not None and self._is_read_error(error):
+            reason = 'read'
+        else:
+            reason = 'other'
+        # Raises once retries are exhausted or the error is not retryable; only
+        # a returned policy means another attempt will actually be made
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        metrics.HTTP_CLIENT_RETRIES.labels(reason).inc()
+        return retry
+    
+    def get_backoff_time(self):
+        return min(super().get_backoff_time(), RETRY_BACKOFF_MAX)
+    
+    def get_retry_after(self, response):
+        # A server-supplied Retry-After must not park the request thread for longer either
+        retry_after = super().get_retry_after(response)
+        return min(retry_after, RETRY_BACKOFF_MAX) if retry_after is not None else None
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        metrics.HTTP_CLIENT_CONNECTIONS.labels('http').inc()
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        metrics.HTTP_CLIENT_CONNECTIONS.labels('https').inc()
+        return super()._new_conn()
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools count the connections they open"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool
+        }
+
+
+class _BodyReader:
+    """Incrementally decompresses and accumulates a response body within limits"""
+
+    def __init__(self, content_encoding, max_bytes):
+        self.max_bytes = max_bytes
+        self.decoder = _decoder(content_encoding)
+        self.raw_deflate = content_encoding and content_encoding.strip().lower() == 'deflate'
+        self.compressed = 0
+        self.body = bytearray()
+
+    def _append(self, data):
+        self.body += data
+        if len(self.body) > self.max_bytes:
+            raise FetchError(f"Page is larger than the {self.max_bytes / (1024 * 1024):.1f} MB limit",
+                             status=413, reason='too_large')
+        if (self.decoder is not None and len(self.body) > DECOMPRESSION_RATIO_FLOOR
+                and len(self.body) > self.compressed * MAX_DECOMPRESSION_RATIO):
+            raise FetchError("Compressed page expands beyond the allowed ratio", status=413, reason='decompression')
+
+    def feed(self, chunk):
+        self.compressed += len(chunk)
+        if self.decoder is None:
+            self._append(chunk)
+            return
+        try:
+            # max_length bounds each step, so a bomb never inflates past the cap in one call
+            data = self.decoder.decompress(chunk, self.max_bytes + 1 - len(self.body))
+            self._append(data)
+            while self.decoder.unconsumed_tail:
+                data = self.decoder.decompress(self.decoder.unconsumed_tail, self.max_bytes + 1 - len(self.body))
+                self._append(data)
+        except zlib.error as e:
+            if self.raw_deflate and not self.body:
+                # Some servers send raw deflate without the zlib header
+                self.raw_deflate = False
+                self.decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+                self.compressed = 0
+                self.feed(chunk)
+                return
+            raise FetchError(f"Corrupt compressed response: {e}", status=502, reason='decompression')
+
+    def finish(self):
+        if self.decoder is not None:
+            self._append(self.decoder.flush())
+        return bytes(self.body)
+
+
+def _parse_http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _cache_directives(headers):
+    """Cache-Control directives as {name: value or True}"""
+    directives = {}
+    for part in headers.get('Cache-Control', '').split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"') if value else True
+    return directives
+
+
+def freshness_lifetime(headers, now):
+    """Seconds a response stays fresh, or None when it must not be stored"""
+    directives = _cache_directives(headers)
+    if 'no-store' in directives or headers.get('Vary', '').strip() == '*':
+        return None
+    if 'no-cache' in directives:
+        return 0
+    
+    for name in ('s-maxage', 'max-age'):
+        if name in directives:
+            try:
+                return max(0, int(directives[name]))
+            except (TypeError, ValueError):
+                return 0
+    
+    date = _parse_http_date(headers.get('Date')) or now
+    expires = headers.get('Expires')
+    if expires is not None:
+        expires_at = _parse_http_date(expires)
+        return max(0, expires_at - date) if expires_at else 0
+    
+    last_modified = _parse_http_date(headers.get('Last-Modified'))
+    if last_modified:
+        return min(HEURISTIC_FRESHNESS_MAX, max(0, (date - last_modified) * HEURISTIC_FRESHNESS_FRACTION))
+    return 0
+
+
 class WebsiteProcessor:
-    """Handle website content extraction and scraping"""
+    """Handle website content extraction and scraping
     
-    def __init__(self):
+    Owns one pooled requests.Session: keep-alive connections are reused across
+    requests, at most pool_maxsize connections are opened per host (further
+    requests wait for a free one), and idempotent requests are retried with
+    capped exponential backoff on connection errors and retryable statuses.
+    With cache_dir set, pages and their extracted content are kept on disk and
+    reused while fresh per Cache-Control/Expires, then revalidated with
+    If-None-Match/If-Modified-Since so a 304 skips both download and parsing.
+    Bodies are streamed: non-HTML responses are refused from their headers or
+    first bytes, and downloads stop at max_bytes (after decompression) or after
+    max_fetch_seconds, so memory per request stays bounded.
+    """
+    
+    def __init__(self, connect_timeout=5, read_timeout=20, max_retries=3, backoff_factor=0.5,
+                 pool_connections=20, pool_maxsize=10, cache_dir=None, cache_max_bytes=256 * 1024 * 1024,
+                 max_bytes=5 * 1024 * 1024, max_fetch_seconds=30, extractor='lxml'):
         self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            # Only encodings _BodyReader can inflate under its limits
+            'Accept-Encoding': 'gzip, deflate',
+            'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.1'
         }
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_bytes = max_bytes
+        self.max_fetch_seconds = max_fetch_seconds
+        self.extractor = get_extractor(extractor)
+        # Cached results are tied to the engine that produced them
+        self.extractor_version = f"{self.extractor.name}-{URL_EXTRACTOR_VERSION}"
+        self.session = self._build_session(max_retries, backoff_factor, pool_connections, pool_maxsize)
+        # Raw responses plus their extracted result, revalidated with conditional GETs
+        self.http_cache = DiskCache(cache_dir, max_bytes=cache_max_bytes, name='http') if cache_dir else None
+    
+    def _build_session(self, max_retries, backoff_factor, pool_connections, pool_maxsize):
+        retry = _CountingRetry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = _PooledAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+            max_retries=retry
+        )
+        
+        session = requests.Session()
+        session.headers.update(self.headers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
     
-    def extract_with_beautifulsoup(self, url):
-        """Extract content using BeautifulSoup"""
+    def fetch(self, url, headers=None):
+        """GET a URL through the pooled session, recording outcome and latency
+        
+        Returns (response, body). Redirects are followed here, at most
+        MAX_REDIRECTS of them, without reading their bodies. Only 200 responses
+        have their body read; it is checked and size-limited by _read_body.
+        Raises FetchError when refused.
+        """
+        start = time.perf_counter()
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
-            response.raise_for_status()
+            response = self._follow_redirects(url, headers)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            body = b''
+            try:
+                if response.status_code == 200:
+                    body = self._read_body(response, start)
+            except (FetchError, requests.exceptions.RequestException):
+                # Closing with unread data drops the connection instead of draining it
+                response.close()
+                raise
             
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', 'iframe', 'noscript']):
-                element.decompose()
-            
-            # Get title
-            title = soup.find('title')
-            title_text = title.get_text().strip() if title else 'Webpage'
+            if response.status_code in (200, 304):
+                response.raw.release_conn()
+            else:
+                response.close()
+            return response, body
+        except FetchError as e:
+            metrics.HTTP_CLIENT_ABORTS.labels(e.reason).inc()
+            raise
+        finally:
+            metrics.HTTP_CLIENT_DURATION.observe(time.perf_counter() - start)
+    
+    def _follow_redirects(self, url, headers):
+        """Response of the last hop; 3xx bodies are discarded unread"""
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._get(url, headers)
+            if not response.is_redirect:
+                return response
+            location = response.headers['Location']
+            response.close()
+            url = urljoin(url, location)
+            if not url.lower().startswith(('http://', 'https://')):
+                raise FetchError("Page redirects to an unsupported URL", status=400, reason='redirect')
+        raise FetchError(f"Page redirects more than {MAX_REDIRECTS} times", status=502, reason='redirect')
+    
+    def _get(self, url, headers):
+        """One GET with redirects disabled, counted by outcome"""
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True,
+                                        allow_redirects=False)
+        except requests.exceptions.RequestException as e:
+            metrics.HTTP_CLIENT_REQUESTS.labels(_failure_outcome(e)).inc()
+            raise
+        
+        metrics.HTTP_CLIENT_REQUESTS.labels(f"{response.status_code // 100}xx").inc()
+        return response
+    
+    def _read_body(self, response, start):
+        """Stream the body, refusing non-HTML and stopping at the size and time limits"""
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in HTML_CONTENT_TYPES and content_type not in SNIFFED_CONTENT_TYPES:
+            raise FetchError(f"URL does not point to a web page (content type {content_type})",
+                             status=415, reason='content_type')
+        
+        content_length = response.headers.get('Content-Length', '')
+        encoding = response.headers.get('Content-Encoding')
+        if content_length.isdigit() and not encoding and int(content_length) > self.max_bytes:
+            raise FetchError(f"Page is larger than the {self.max_bytes / (1024 * 1024):.1f} MB limit",
+                             status=413, reason='too_large')
+        
+        reader = _BodyReader(encoding, self.max_bytes)
+        sniffed = content_type in HTML_CONTENT_TYPES
+        deadline = start + self.max_fetch_seconds
+        
+        for chunk in self._iter_raw(response, deadline):
+            reader.feed(chunk)
+            if not sniffed and len(reader.body) >= SNIFF_BYTES:
+                self._sniff(reader.body)
+                sniffed = True
+        
+        body = reader.finish()
+        if not sniffed:
+            self._sniff(body)
+        return body
+    
+    def _iter_raw(self, response, deadline):
+        """Yield raw body bytes as they arrive, never blocking past the deadline
+        
+        read1 returns after a single socket read, and the socket timeout is cut
+        to the remaining budget before each one, so a server dripping a byte at
+        a time cannot hold the download open beyond max_fetch_seconds.
+        """
+        fp = response.raw._fp  # http.client response; urllib3 has not read from it yet
+        connection = getattr(response.raw, 'connection', None)
+        sock = getattr(connection, 'sock', None)
+        read_timeout = self.timeout[1]
+        
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise FetchError(f"Page took longer than {self.max_fetch_seconds:g}s to download",
+                                 status=504, reason='timeout')
+            if sock is not None:
+                sock.settimeout(min(read_timeout, remaining))
+            try:
+                chunk = fp.read1(FETCH_CHUNK_SIZE)
+            except socket.timeout as e:
+                if time.perf_counter() >= deadline:
+                    raise FetchError(f"Page took longer than {self.max_fetch_seconds:g}s to download",
+                                     status=504, reason='timeout')
+                raise requests.exceptions.ReadTimeout(e)
+            except (http.client.HTTPException, OSError) as e:
+                raise requests.exceptions.ConnectionError(e)
+            if not chunk:
+                if fp.length:
+                    raise requests.exceptions.ConnectionError(
+                        f"Connection closed with {fp.length} bytes of the page unread"
+                    )
+                # read1 does not close a response whose Content-Length is exhausted;
+                # closing it lets the pooled connection carry the next request
+                fp.close()
+                return
+            yield chunk
+    
+    @staticmethod
+    def _sniff(prefix):
+        text = bytes(prefix[:SNIFF_BYTES]).lstrip(b'\xef\xbb\xbf')
+        if not HTML_SIGNATURE.match(text):
+            raise FetchError("URL does not point to a web page", status=415, reason='content_type')
+    
+    def close(self):
+        self.session.close()
+    
+    def parse_html(self, content, url):
+        """Extract title, main text and author from an HTML document"""
+        with tracing.span('url.parse', parser=self.extractor.name):
+            page = self.extractor.extract(content)
+        
+        text = page['text']
+        if len(text.split()) < 50:
+            raise Exception("Not enough content extracted from the webpage")
+        
+        return {
+            'success': True,
+            'title': page['title'],
+            'text': text,
+            'url': url,
+            'word_count': len(text.split()),
+            'authors': page['authors'],
+            'method': self.extractor.name
+        }
+    
+    def _cached_result(self, entry, url):
+        """Extraction result stored with a cache entry, re-parsed if the extractor changed"""
+        if entry.get('extractor_version') != self.extractor_version:
+            entry['result'] = self.parse_html(entry['body'].encode('latin-1'), url)
+            entry['extractor_version'] = self.extractor_version
+        return dict(entry['result'], url=url)
+    
+    def _store(self, key, url, response, body, result, lifetime, now):
+        if lifetime is None:
+            return
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        # Nothing to gain from an entry that is stale immediately and cannot be revalidated
+        if not lifetime and not etag and not last_modified:
+            return
+        self.http_cache.set(key, {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'expires_at': now + lifetime,
+            # latin-1 maps bytes to code points one to one, so the body round-trips through JSON
+            'body': body.decode('latin-1'),
+            'extractor_version': self.extractor_version,
+            'result': result
+        })
+    
+    def extract_page(self, url):
+        """Fetch and extract a page, served from the HTTP cache when possible"""
+        try:
+            now = time.time()
+            key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+            entry = self.http_cache.get(key) if self.http_cache else None
             
-            # Try to find main content
-            main_content = None
+            if entry and entry['expires_at'] > now:
+                with tracing.span('url.cache', state='fresh'):
+                    return self._cached_result(entry, url)
             
-            for selector in ['article', 'main', '[role="main"]']:
-                main_content = soup.select_one(selector)
-                if main_content:
-                    break
+            conditional_headers = {}
+            if entry:
+                if entry.get('etag'):
+                    conditional_headers['If-None-Match'] = entry['etag']
+                if entry.get('last_modified'):
+                    conditional_headers['If-Modified-Since'] = entry['last_modified']
             
-            if not main_content:
-                for pattern in ['content', 'article', 'post', 'entry', 'body']:
-                    main_content = soup.find(['div', 'section'], class_=re.compile(pattern, re.I))
-                    if main_content:
-                        break
+            with tracing.span('url.fetch', url=url, conditional=bool(conditional_headers)) as span:
+                response, body = self.fetch(url, headers=conditional_headers or None)
+                span.set_attribute('http.status_code', response.status_code)
+                span.set_attribute('bytes', len(body))
             
-            if not main_content:
-                main_content = soup.find('body')
+            if response.status_code == 304 and entry:
+                metrics.CACHE_LOOKUPS.labels('http', 'revalidated').inc()
+                # A 304 carries updated freshness headers but not the body
+                lifetime = freshness_lifetime(response.headers, now)
+                result = self._cached_result(entry, url)
+                entry['expires_at'] = now + (lifetime or 0)
+                entry['etag'] = response.headers.get('ETag', entry.get('etag'))
+                entry['last_modified'] = response.headers.get('Last-Modified', entry.get('last_modified'))
+                self.http_cache.set(key, entry)
+                return result
             
-            # Extract text
-            if main_content:
-                paragraphs = main_content.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-                text_parts = [p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)]
-                text = ' '.join(text_parts)
-            else:
-                text = soup.get_text(separator=' ', strip=True)
+            response.raise_for_status()
             
-            # Clean up text
-            text = re.sub(r'\s+', ' ', text).strip()
+            result = self.parse_html(body, url)
             
-            if len(text.split()) < 50:
-                raise Exception("Not enough content extracted from the webpage")
+            if self.http_cache and response.status_code == 200:
+                self._store(key, url, response, body, result, freshness_lifetime(response.headers, now), now)
             
-            # Try to find author
-            author = 'Unknown'
-            author_meta = soup.find('meta', attrs={'name': re.compile('author', re.I)})
-            if author_meta and author_meta.get('content'):
-                author = author_meta['content']
+            return result
             
+        except FetchError as e:
+            logger.warning(f"Refused to download {url}: {e}")
             return {
-                'success': True,
-                'title': title_text,
-                'text': text,
-                'url': url,
-                'word_count': len(text.split()),
-                'authors': author,
-                'method': 'beautifulsoup'
+                'success': False,
+                'error': str(e),
+                'status': e.status
             }
-            
         except Exception as e:
-            logger.error(f"BeautifulSoup extraction failed: {e}")
+            logger.error(f"Content extraction failed: {e}")
             return {
                 'success': False,
                 'error': f'Failed to extract content: {str(e)}'
@@ -109,7 +549,7 @@ class WebsiteProcessor:
                 'error': 'Invalid URL format.'
             }
         
-        return self.extract_with_beautifulsoup(url)
+        return self.extract_page(url)
 
 
 # Utility functions